@@ -6,5 +6,7 @@ from cornflow_client.core import (
     InstanceCore,
     SolutionCore,
     ExperimentCore,
+    Index,
+    memoize,
 )
 from cornflow_client.schema.tools import get_empty_schema, get_pulp_jsonschema
@@ -4,14 +4,36 @@
 # Full imports
 import json
 import os
+import threading
 
 # Partial imports
 from datetime import datetime, timedelta
+from timeit import default_timer as timer
 from urllib.parse import urlparse, urljoin
 
 
 # Imports from modules
 from cornflow_client import CornFlow, CornFlowApiError
+from cornflow_client.constants import (
+    EXEC_STATE_RUNNING,
+    EXEC_STATE_STOPPED,
+    SENSE_MINIMIZE,
+)
+from cornflow_client.core import ApplicationCore
+from cornflow_client.core.cancellation import (
+    clear_stop,
+    install_signal_handler,
+    request_stop,
+    restore_signal_handler,
+)
+from cornflow_client.core.log_buffer import DEFAULT_LOG_SIZE, LogBuffer
+from cornflow_client.core.tools import copy
+from cornflow_client.core.profiling import (
+    SolveProfile,
+    capture_hotspots,
+    get_capture_options,
+    get_payload_size,
+)
 
 
 # TODO: convert everything to an object that encapsulates everything
@@ -138,6 +160,27 @@ def get_schema(dag_name):
     return schema
 
 
+def merge_profiles(solve_profile, dag_profile):
+    """
+    Joins the profile of the solve method with the profile of the dag task.
+    The phases measured by the dag task are prefixed with "dag_".
+
+    :param solve_profile: profile returned by the solve method, if any
+    :param dag_profile: profile measured in the dag task
+    :return: the merged profile
+    """
+    if not solve_profile:
+        solve_profile = dict(phases=dict(), sizes=dict(), conversion=dict())
+    for name, phase in dag_profile["phases"].items():
+        solve_profile["phases"][f"dag_{name}"] = phase
+    solve_profile["sizes"].update(dag_profile["sizes"])
+    solve_profile["peak_rss"] = dag_profile["peak_rss"]
+    for key in ["hotspots", "allocations", "traced_peak"]:
+        if key in dag_profile:
+            solve_profile[key] = dag_profile[key]
+    return solve_profile
+
+
 def cf_solve_app(app, secrets, **kwargs):
     return cf_solve(app.solve, app.name, secrets, **kwargs)
 
@@ -151,14 +194,59 @@ def cf_solve(fun, dag_name, secrets, **kwargs):
     :param kwargs: other kwargs passed to the dag task.
     :return:
     """
-    client = connect_to_cornflow(secrets)
+    profile = SolveProfile()
+    with profile.phase("connection"):
+        client = connect_to_cornflow(secrets)
     exec_id = kwargs["dag_run"].conf["exec_id"]
-    execution_data = client.get_data(exec_id)
+    with profile.phase("fetch"):
+        execution_data = client.get_data(exec_id)
     data = execution_data["data"]
     config = execution_data["config"]
     inst_id = execution_data["id"]
+    # the solve method of the applications already captures the hotspots of the solver
+    if isinstance(getattr(fun, "__self__", None), ApplicationCore):
+        capture_options = dict()
+    else:
+        capture_options = get_capture_options(config)
+    # the improved solutions reported by the solver are sent to cornflow while it runs
+    app = getattr(fun, "__self__", None)
+    checkpointer = None
+    if isinstance(app, ApplicationCore) and config.get("checkpointInterval"):
+        checkpointer = SolutionCheckpointer(
+            client,
+            exec_id,
+            dag_name,
+            min_interval=config["checkpointInterval"],
+            min_improvement=config.get("checkpointImprovement", 0),
+            sense=app.sense,
+        )
+        checkpointer.start()
+        app.incumbent_callbacks.append(checkpointer)
+    # the log of the solver is sent to cornflow while it runs
+    streamer = None
+    if isinstance(app, ApplicationCore) and config.get("logStreamInterval"):
+        app.log_stream = LogBuffer(config.get("logMaxSize", DEFAULT_LOG_SIZE))
+        streamer = LogStreamer(
+            client, exec_id, app.log_stream, interval=config["logStreamInterval"]
+        )
+        streamer.start()
+    # with stopPollInterval, the state of the execution is polled every that many seconds
+    # and the solvers are asked to stop if the execution is stopped in cornflow.
+    # With stopOnSignal, they are also asked to stop when the task is terminated (SIGTERM),
+    # instead of letting airflow raise an exception. Only for solvers that check should_stop.
+    clear_stop()
+    previous_handler = None
+    if config.get("stopOnSignal", False):
+        previous_handler = install_signal_handler()
+    watcher = None
+    if config.get("stopPollInterval"):
+        watcher = ExecutionStopWatcher(
+            client, exec_id, interval=config["stopPollInterval"]
+        )
+        watcher.start()
     try:
-        solution, sol_checks, inst_checks, log, log_json = fun(data, config)
+        with profile.phase("solve"), capture_hotspots(**capture_options) as capture:
+            solution, sol_checks, inst_checks, log, log_json = fun(data, config)
     except NoSolverException as e:
         if config.get("msg", True):
             print("No solver found !")
@@ -169,6 +257,28 @@ def cf_solve(fun, dag_name, secrets, **kwargs):
             print("Some unknown error happened")
         try_to_save_error(client, exec_id, -1)
         raise AirflowDagException("There was an error during the solving")
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        restore_signal_handler(previous_handler)
+        # a stop request does not outlive the solve
+        clear_stop()
+        if checkpointer is not None:
+            # no checkpoint can be written after the final solution
+            app.incumbent_callbacks.remove(checkpointer)
+            checkpointer.stop()
+        if streamer is not None:
+            app.log_stream = None
+            streamer.stop()
+
+    if isinstance(log_json, dict):
+        # measuring the payloads serializes them again: only with profileSizes
+        if config.get("profileSizes", False):
+            profile.add_size("instance", get_payload_size(data))
+            if solution:
+                profile.add_size("solution", get_payload_size(solution))
+        profile.capture = capture
+        log_json["profile"] = merge_profiles(log_json.get("profile"), profile.to_dict())
 
     payload = dict(
         state=1,
@@ -203,6 +313,164 @@ def cf_solve(fun, dag_name, secrets, **kwargs):
     return "Solution saved"
 
 
+class ExecutionStopWatcher(threading.Thread):
+    """
+    Background thread that polls the state of the execution in cornflow
+    and asks the solvers to stop when the execution has been stopped.
+    """
+
+    def __init__(self, client, exec_id, interval=30):
+        super().__init__(daemon=True)
+        self.client = client
+        self.exec_id = exec_id
+        self.interval = interval
+        self._finished = threading.Event()
+
+    def run(self):
+        while not self._finished.wait(self.interval):
+            try:
+                state = self.client.get_status(self.exec_id).get("state")
+            except Exception as e:
+                print(f"An exception trying to get the status of the execution: {e}")
+                continue
+            if state == EXEC_STATE_STOPPED:
+                request_stop()
+                return
+
+    def stop(self):
+        self._finished.set()
+        if self.is_alive():
+            self.join()
+
+
+class SolutionCheckpointer(threading.Thread):
+    """
+    Writes the improved solutions reported by the solver into cornflow while it runs.
+    It is used as an incumbent callback (see :py:meth:`ExperimentCore.report_incumbent`):
+    the solver thread only takes a copy of the solution and the writing happens in this thread,
+    so the solver never waits for the request.
+
+    A solution is only sent if its objective improves the last one sent by min_improvement
+    (relative), and at least min_interval seconds after the last one sent. The solutions that
+    arrive before are kept waiting: when the interval expires, the last of them is sent.
+    """
+
+    def __init__(
+        self,
+        client,
+        exec_id,
+        dag_name,
+        min_interval=60,
+        min_improvement=0,
+        sense=SENSE_MINIMIZE,
+    ):
+        super().__init__(daemon=True)
+        self.client = client
+        self.exec_id = exec_id
+        self.dag_name = dag_name
+        self.min_interval = min_interval
+        self.min_improvement = min_improvement
+        self.sense = sense
+        self.written = 0
+        self._last_time = None
+        self._last_objective = None
+        self._pending = None
+        self._lock = threading.Lock()
+        self._new_solution = threading.Event()
+        self._finished = threading.Event()
+
+    def is_improvement(self, objective):
+        if self._last_objective is None or objective is None:
+            return True
+        improvement = self.sense * (self._last_objective - objective)
+        return improvement > self.min_improvement * abs(self._last_objective)
+
+    def __call__(self, solution, objective):
+        if not self.is_improvement(objective):
+            return
+        # the solver may keep modifying its solution: we send a copy
+        data = copy(solution.to_dict())
+        with self._lock:
+            self._pending = data, objective
+        self._new_solution.set()
+
+    def run(self):
+        while True:
+            self._new_solution.wait()
+            if self._finished.is_set():
+                return
+            if self._last_time is not None:
+                # the solutions that arrive meanwhile replace the pending one
+                delay = self._last_time + self.min_interval - timer()
+                if delay > 0 and self._finished.wait(delay):
+                    return
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._new_solution.clear()
+            if pending is None:
+                continue
+            data, objective = pending
+            self._last_time = timer()
+            self._last_objective = objective
+            try:
+                self.client.write_solution(
+                    execution_id=self.exec_id,
+                    data=data,
+                    state=EXEC_STATE_RUNNING,
+                    solution_schema=self.dag_name,
+                )
+                self.written += 1
+            except Exception as e:
+                print(f"An exception trying to write an intermediate solution: {e}")
+
+    def stop(self):
+        """
+        Stops the thread. A solution that was waiting to be sent is discarded.
+        """
+        self._finished.set()
+        self._new_solution.set()
+        if self.is_alive():
+            self.join()
+
+
+class LogStreamer(threading.Thread):
+    """
+    Sends the log of the solver to cornflow every interval seconds while it runs.
+    The log is read from a bounded stream (see :py:class:`LogBuffer`), so the text sent
+    is at most the last characters kept by the stream.
+    Nothing is sent if the solver did not write anything since the last time.
+    """
+
+    def __init__(self, client, exec_id, log_stream, interval=30):
+        super().__init__(daemon=True)
+        self.client = client
+        self.exec_id = exec_id
+        self.log_stream = log_stream
+        self.interval = interval
+        self.written = 0
+        self._finished = threading.Event()
+
+    def run(self):
+        while not self._finished.wait(self.interval):
+            if not self.log_stream.read_new():
+                continue
+            try:
+                # cornflow replaces the log of the execution: we send all the text kept
+                self.client.write_solution(
+                    execution_id=self.exec_id,
+                    log_text=self.log_stream.getvalue(),
+                    state=EXEC_STATE_RUNNING,
+                )
+                self.written += 1
+            except Exception as e:
+                print(f"An exception trying to write the log: {e}")
+
+    def stop(self):
+        self._finished.set()
+        if self.is_alive():
+            self.join()
+
+
 class NoSolverException(Exception):
     pass
 
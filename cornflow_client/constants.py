@@ -41,6 +41,19 @@ STATUS_LICENSING_PROBLEM = -5
 SOLUTION_STATUS_INFEASIBLE = 0
 SOLUTION_STATUS_FEASIBLE = 2
 
+# state of an execution in cornflow
+EXEC_STATE_RUNNING = 0
+EXEC_STATE_STOPPED = -2
+
+# direction of the objective
+SENSE_MINIMIZE = 1
+SENSE_MAXIMIZE = -1
+
+# storage of the data of instances and solutions
+STORAGE_DICT = "dict"
+STORAGE_COLUMNAR = "columnar"
+STORAGE_LAZY = "lazy"
+
 PYOMO_STOP_MAPPING = {
     "unbounded": STATUS_UNBOUNDED,
     "infeasible": STATUS_INFEASIBLE,
@@ -129,3 +142,20 @@ class BadInstance(Exception):
 
 class BadSolution(Exception):
     pass
+
+
+class LimitExceeded(BaseException):
+    """
+    Raised in the solver when it goes over a limit.
+    Like KeyboardInterrupt, it is not caught by the `except Exception` clauses of the solver.
+    """
+
+    pass
+
+
+class MemoryLimitExceeded(LimitExceeded):
+    pass
+
+
+class TimeLimitExceeded(LimitExceeded):
+    pass
@@ -3,4 +3,6 @@ from .experiment import ExperimentCore
 from .instance_solution import InstanceSolutionCore
 from .instance import InstanceCore
 from .solution import SolutionCore
+from .indexes import Index
+from .memoize import memoize
 from .extra_methods import *
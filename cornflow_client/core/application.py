@@ -3,14 +3,32 @@
 """
 # Partial imports
 from abc import ABC, abstractmethod
-from jsonschema import Draft7Validator
 from timeit import default_timer as timer
-from typing import Type, Dict, List, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Type, Dict, Iterator, List, Tuple, Union
 
 # Imports from internal modules
 from .instance import InstanceCore
 from .solution import SolutionCore
 from .experiment import ExperimentCore
+from .benchmark import run_benchmark
+from .cancellation import stop_requested
+from .fingerprint import get_fingerprint
+from .result_cache import DEFAULT_CACHE_SIZE, ResultCache, get_result_key
+from .isolation import IsolatedRun, run_isolated
+from .limits import get_time_limits, memory_limit, time_limit
+from .log_buffer import DEFAULT_LOG_SIZE, LogBuffer
+from .parallel import (
+    get_max_workers,
+    init_worker,
+    reaches_target,
+    run_parallel,
+    solve_task,
+    stop_executor,
+    summarize,
+)
+from .profiling import SolveProfile, capture_hotspots, get_capture_options
+from .tools import get_validator
 
 from cornflow_client.constants import (
     STATUS_OPTIMAL,
@@ -18,12 +36,16 @@ from cornflow_client.constants import (
     STATUS_INFEASIBLE,
     STATUS_UNDEFINED,
     STATUS_TIME_LIMIT,
+    STATUS_MEMORY_LIMIT,
     SOLUTION_STATUS_FEASIBLE,
     SOLUTION_STATUS_INFEASIBLE,
+    SENSE_MINIMIZE,
     NoSolverException,
     BadConfiguration,
     BadSolution,
     BadInstance,
+    MemoryLimitExceeded,
+    TimeLimitExceeded,
 )
 
 
@@ -51,6 +73,86 @@ class ApplicationCore(ABC):
         """
         return None
 
+    @property
+    def sense(self) -> int:
+        """
+        Optional property
+
+        :return: the direction of the objective returned by the solvers' get_objective:
+          SENSE_MINIMIZE (default) or SENSE_MAXIMIZE
+        """
+        return SENSE_MINIMIZE
+
+    @property
+    def incumbent_callbacks(self) -> List[Callable]:
+        """
+        Functions called with the solution and its objective value each time the solver
+        reports an improved solution (see :py:meth:`ExperimentCore.report_incumbent`).
+        They are only called when the solver runs in this process.
+
+        :return: the list of callbacks, that can be modified
+        """
+        if "_incumbent_callbacks" not in self.__dict__:
+            self._incumbent_callbacks = []
+        return self._incumbent_callbacks
+
+    @property
+    def log_stream(self) -> Union[LogBuffer, None]:
+        """
+        Optional stream where the solvers running in this process write their log
+        (see :py:attr:`ExperimentCore.log_stream`), so it can be read while they run.
+
+        :return: the stream, None by default
+        """
+        return self.__dict__.get("_log_stream")
+
+    @log_stream.setter
+    def log_stream(self, value: Union[LogBuffer, None]) -> None:
+        self._log_stream = value
+
+    @property
+    def compiled_instances_dir(self) -> Union[str, None]:
+        """
+        Optional property
+
+        :return: directory where the instances are compiled (see :py:meth:`InstanceCore.compile`).
+          When it is given, an instance whose data was already solved is loaded from there
+          instead of being built again. None by default.
+        """
+        return None
+
+    @property
+    def compiled_instances_size(self) -> int:
+        """
+        Optional property
+
+        :return: maximum size of the compiled instances directory in bytes
+        """
+        return DEFAULT_CACHE_SIZE
+
+    @property
+    def result_cache_dir(self) -> Union[str, None]:
+        """
+        Optional property
+
+        :return: directory where the results of the solve method are cached.
+          A solve with the same data, configuration, solver and solver version
+          returns the cached result instead of solving again.
+          The solvers that are not deterministic (see :py:attr:`ExperimentCore.deterministic`)
+          or that do not have a version (see :py:attr:`ExperimentCore.version`) are not cached.
+          None by default.
+        """
+        return None
+
+    @property
+    def result_cache_size(self) -> int:
+        """
+        Optional property
+
+        :return: maximum size of the result cache in bytes
+        """
+        return DEFAULT_CACHE_SIZE
+
     @property
     @abstractmethod
     def instance(self) -> Type[InstanceCore]:
@@ -110,18 +212,30 @@ class ApplicationCore(ABC):
     ) -> Tuple[Dict, Union[Dict, None], Union[Dict, None], str, Dict]:
         """
         :param data: json for the problem
-        :param config: execution configuration, including solver
+        :param config: execution configuration, including solver.
+          If it includes maxMemory (in megabytes), the solver is stopped when the
+          process goes over that memory and the log reports the memory limit status.
+          If it includes isolated, the solver runs in a child process with a
+          wall-clock watchdog based on timeLimit.
+          If it includes portfolio, several solvers run at the same time
+          and the best solution is kept.
+          If it includes multiStart, several copies of the solver run at the same time
+          with different seeds and the best solution is kept.
+          If it includes logMaxSize, only the last logMaxSize characters of the log
+          of the solver are kept in memory.
         :param solution_data: optional json with an initial solution
         :return: solution, solution checks, instance checks and logs
         """
         if config.get("msg", True):
             print("Solving the model")
-        validator = Draft7Validator(self.schema)
-        if not validator.is_valid(config):
-            error_list = [e for e in validator.iter_errors(config)]
-            raise BadConfiguration(
-                f"The configuration does not match the schema:\n{error_list}"
-            )
+        profile = SolveProfile()
+        with profile.phase("validation"):
+            validator = get_validator(self.schema)
+            if not validator.is_valid(config):
+                error_list = [e for e in validator.iter_errors(config)]
+                raise BadConfiguration(
+                    f"The configuration does not match the schema:\n{error_list}"
+                )
 
         solver = config.get("solver")
         if solver is None:
@@ -129,20 +243,60 @@ class ApplicationCore(ABC):
         solver_class = self.get_solver(name=solver)
         if solver_class is None:
             raise NoSolverException(f"Solver {solver} is not available")
-        inst = self.instance.from_dict(data)
-        inst_errors = inst.check_schema()
-        if inst_errors:
-            raise BadInstance(f"The instance does not match the schema:\n{inst_errors}")
+        compiled_dir = self.compiled_instances_dir
+        cache = self._get_result_cache(solver_class, config)
+        content_hash = None
+        if compiled_dir is not None or cache is not None:
+            content_hash = get_fingerprint(data)
+        if cache is not None:
+            cache_key = get_result_key(
+                self.name,
+                solver,
+                solver_class.version,
+                content_hash,
+                config,
+                solution_data,
+            )
+            with profile.phase("result_cache"):
+                result = cache.get(cache_key)
+            if result is not None:
+                sol, checks, instance_checks, log_txt, log = result
+                log = dict(log, cached=True, profile=profile.to_dict())
+                return sol, checks, instance_checks, log_txt, log
+        inst = None
+        with profile.phase("instance"):
+            if compiled_dir is not None:
+                inst = self.instance.from_compiled(compiled_dir, content_hash)
+            compiled = inst is not None
+            if not compiled:
+                inst = self.instance.from_dict(data)
+        if not compiled:
+            profile.add_conversion("instance", getattr(inst, "_conversion_time", None))
+            # a compiled instance already matched the schema when it was compiled
+            with profile.phase("instance_schema"):
+                inst_errors = inst.check_schema()
+            if inst_errors:
+                raise BadInstance(
+                    f"The instance does not match the schema:\n{inst_errors}"
+                )
+            if compiled_dir is not None:
+                with profile.phase("instance_compile"):
+                    inst.compile(
+                        compiled_dir, content_hash, self.compiled_instances_size
+                    )
         sol = None
         if solution_data is not None:
-            sol = self.solution.from_dict(solution_data)
-            sol_errors = sol.check_schema()
+            with profile.phase("solution"):
+                sol = self.solution.from_dict(solution_data)
+                sol_errors = sol.check_schema()
+            profile.add_conversion("solution", getattr(sol, "_conversion_time", None))
             if sol_errors:
                 raise BadSolution(
                     f"The solution does not match the schema:\n{sol_errors}"
                 )
 
-        instance_checks = inst.check()
+        with profile.phase("instance_checks"):
+            instance_checks = inst.check()
         if instance_checks:
             log = dict(
                 time=0,
@@ -150,16 +304,29 @@ class ApplicationCore(ABC):
                 status="Infeasible",
                 status_code=STATUS_INFEASIBLE,
                 sol_code=SOLUTION_STATUS_INFEASIBLE,
+                profile=profile.to_dict(),
             )
             return dict(), None, instance_checks, "", log
 
-        algo = solver_class(inst, sol)
         start = timer()
-        output = algo.solve(config)
+        capture_options = get_capture_options(config)
+        with profile.phase("solve"), capture_hotspots(**capture_options) as capture:
+            if config.get("portfolio"):
+                algo, output, log_txt, info = self._run_portfolio(inst, sol, config)
+            elif config.get("multiStart"):
+                algo, output, log_txt, info = self._run_multi_start(
+                    solver_class, inst, sol, config
+                )
+            else:
+                algo, output, log_txt, info = self._run_solver(
+                    solver_class, inst, sol, config
+                )
+        profile.capture = capture
         sol = None
         status_conv = {
             STATUS_OPTIMAL: "Optimal",
             STATUS_TIME_LIMIT: "Time limit",
+            STATUS_MEMORY_LIMIT: "Memory limit",
             STATUS_INFEASIBLE: "Infeasible",
             STATUS_UNDEFINED: "Unknown",
             STATUS_NOT_SOLVED: "Not solved",
@@ -176,11 +343,11 @@ class ApplicationCore(ABC):
             status_code=status,
             sol_code=SOLUTION_STATUS_INFEASIBLE,
         )
-
-        try:
-            log_txt = algo.log
-        except:
-            log_txt = ""
+        if output.get("error") is not None:
+            log["error"] = output["error"]
+        if stop_requested():
+            log["stopped"] = True
+        log.update(info)
 
         # check if there is a solution
         # TODO: we need to extract the solution status too
@@ -191,12 +358,259 @@ class ApplicationCore(ABC):
             log["sol_code"] = SOLUTION_STATUS_FEASIBLE
 
         if log["sol_code"] > 0:
-            sol = algo.solution.to_dict()
+            with profile.phase("solution_export"):
+                sol = algo.solution.to_dict()
 
-        checks = algo.check_solution()
+        with profile.phase("solution_checks"):
+            checks = algo.check_solution()
+        log["profile"] = profile.to_dict()
 
+        if cache is not None and self._is_cacheable(log):
+            cache.set(cache_key, (sol, checks, {}, log_txt, log))
         return sol, checks, {}, log_txt, log
 
+    def solve_many(
+        self,
+        datasets: List[dict],
+        configs: Union[dict, List[dict]],
+        max_workers: int = None,
+        task_time_limit: float = None,
+    ) -> Iterator[Tuple[int, Union[Tuple, None], Union[Exception, None]]]:
+        """
+        Solves several datasets over a pool of processes.
+        The results are returned as soon as they finish, not in the order of the datasets.
+
+        The number of workers takes into account the configuration key threads
+        so the solvers that use several threads do not use more threads than cores.
+
+        :param datasets: list of json for the problems
+        :param configs: one configuration for all datasets or a list with one per dataset
+        :param max_workers: maximum number of processes. By default, as many as cores
+          divided by the number of threads of each solve.
+        :param task_time_limit: optional time limit in seconds for each solve.
+          It is used when the configuration has no timeLimit
+          and the solver is stopped if it does not respect it (see timeLimitGrace).
+        :return: yields tuples with the index of the dataset, the result of :py:meth:`solve`
+          and the exception raised by the solve, if any.
+          If the loop stops early, the solves that have not started are cancelled.
+        """
+        if isinstance(configs, dict):
+            configs = [configs] * len(datasets)
+        if len(configs) != len(datasets):
+            raise ValueError("There must be one configuration per dataset")
+        if task_time_limit is not None:
+            # the grace is only removed from the limits given here, not from the configuration
+            configs = [
+                config
+                if "timeLimit" in config
+                else dict(config, timeLimit=task_time_limit, timeLimitGrace=0)
+                for config in configs
+            ]
+        workers = get_max_workers(configs, max_workers)
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(self,)
+        )
+        futures = dict()
+        try:
+            for index, (data, config) in enumerate(zip(datasets, configs)):
+                futures[executor.submit(solve_task, index, data, config)] = index
+            for future in as_completed(futures):
+                try:
+                    index, result = future.result()
+                except Exception as e:
+                    yield futures[future], None, e
+                else:
+                    yield index, result, None
+        finally:
+            stop_executor(executor, futures)
+
+    def benchmark(
+        self,
+        solvers: List[str] = None,
+        cases: List[int] = None,
+        repetitions: int = 1,
+        seeds: List[int] = None,
+        config: dict = None,
+        max_workers: int = None,
+    ) -> List[Dict]:
+        """
+        Solves every test case with every solver and measures the results.
+        The records can be stored with :py:func:`write_benchmark_json` or :py:func:`write_benchmark_csv`
+        and two benchmarks can be compared with :py:func:`compare_benchmarks`.
+
+        :param solvers: names of the solvers to run. All of them by default.
+        :param cases: positions of the test cases to run. All of them by default.
+        :param repetitions: number of times each case is solved with each solver
+        :param seeds: optional list of seeds, one per repetition (configuration key seed)
+        :param config: base configuration for all the solves
+        :param max_workers: maximum number of processes
+        :return: a list with one record per solve with its time, objective, status,
+          number of checks and peak memory
+        """
+        return run_benchmark(
+            self,
+            solvers=solvers,
+            cases=cases,
+            repetitions=repetitions,
+            seeds=seeds,
+            config=config,
+            max_workers=max_workers,
+        )
+
+    def _get_result_cache(
+        self, solver_class: Type[ExperimentCore], config: dict
+    ) -> Union[ResultCache, None]:
+        """
+        :return: the result cache, None if the result of this solve cannot be cached
+        """
+        if self.result_cache_dir is None or not solver_class.deterministic:
+            return None
+        # without a version, a result could be reused by another release of the solver
+        if solver_class.version is None:
+            return None
+        # the result of several solvers running at the same time depends on their timing
+        if config.get("portfolio") or config.get("multiStart"):
+            return None
+        return ResultCache(self.result_cache_dir, self.result_cache_size)
+
+    @staticmethod
+    def _is_cacheable(log: dict) -> bool:
+        """
+        :param log: the log of a solve
+        :return: True if the result does not depend on the time or memory available
+        """
+        if log.get("error") is not None or log.get("stopped"):
+            return False
+        return log["status_code"] not in [STATUS_TIME_LIMIT, STATUS_MEMORY_LIMIT]
+
+    def _run_solver(
+        self,
+        solver_class: Type[ExperimentCore],
+        inst: InstanceCore,
+        sol: Union[SolutionCore, None],
+        config: dict,
+    ) -> Tuple[ExperimentCore, Union[Dict, int], str, Dict]:
+        """
+        Runs the solver in this process or, if the configuration has isolated,
+        in a child process (see :py:func:`run_isolated`).
+        In this process, the solver is stopped at timeLimit plus timeLimitGrace
+        only if timeLimitGrace is part of the configuration.
+
+        :return: the solver after solving, the output of its solve method, its log
+          and extra information for the log
+        """
+        if config.get("isolated", False):
+            result = run_isolated(solver_class, inst, sol, config)
+            algo = self._rebuild_solver(solver_class, inst, result)
+            return algo, result["output"], result["log"], dict()
+
+        # in this process, the time limit is only enforced if the grace is explicitly given
+        soft_limit = None
+        if "timeLimitGrace" in config:
+            soft_limit = get_time_limits(config)[0]
+        algo = solver_class(inst, sol)
+        # each solve has its own log, which is also written in the stream of the app
+        algo.log_stream = LogBuffer(
+            config.get("logMaxSize") or DEFAULT_LOG_SIZE, forward=self.log_stream
+        )
+        for callback in self.incumbent_callbacks:
+            algo.add_incumbent_callback(callback)
+        try:
+            with time_limit(soft_limit), memory_limit(config.get("maxMemory")):
+                output = algo.solve(config)
+        except TimeLimitExceeded:
+            output = dict(status=STATUS_TIME_LIMIT)
+        except MemoryLimitExceeded:
+            # we keep whatever solution the solver had stored so far
+            output = dict(status=STATUS_MEMORY_LIMIT)
+        try:
+            log_txt = algo.log
+        except:
+            log_txt = ""
+        return algo, output, log_txt, dict()
+
+    def _run_portfolio(
+        self, inst: InstanceCore, sol: Union[SolutionCore, None], config: dict
+    ) -> Tuple[ExperimentCore, Union[Dict, int], str, Dict]:
+        """
+        Runs several solvers at the same time, each one in its own process.
+        The configuration key portfolio has the list of solver names to run
+        (or True to run all of them). When one of them proves optimality the rest are stopped.
+        The winner is the solver with the best objective (see :py:attr:`sense`).
+        The solvers run independently: the incumbents found by one are not passed to the rest.
+
+        :return: the winner solver after solving, the output of its solve method, its log
+          and the status, objective and time of each solver for the log
+        """
+        names = config["portfolio"]
+        if names is True:
+            names = list(self.solvers.keys())
+        solver_classes = dict()
+        for name in names:
+            solver_classes[name] = self.get_solver(name=name)
+            if solver_classes[name] is None:
+                raise NoSolverException(f"Solver {name} is not available")
+        runs = {
+            name: IsolatedRun(solver_class, inst, sol, dict(config, solver=name))
+            for name, solver_class in solver_classes.items()
+        }
+        winner, results = run_parallel(runs, sense=self.sense)
+        result = results[winner]
+        algo = self._rebuild_solver(solver_classes[winner], inst, result)
+        info = dict(solver=winner, portfolio=summarize(results))
+        return algo, result["output"], result["log"], info
+
+    def _run_multi_start(
+        self,
+        solver_class: Type[ExperimentCore],
+        inst: InstanceCore,
+        sol: Union[SolutionCore, None],
+        config: dict,
+    ) -> Tuple[ExperimentCore, Union[Dict, int], str, Dict]:
+        """
+        Runs several copies of the same solver at the same time, each one in its own process
+        and with its own seed (configuration key seed). It uses the configuration keys:
+
+        * **multiStart**: number of copies.
+        * **seeds**: optional list of seeds. By default, consecutive seeds starting at seed (or 0).
+        * **targetObjective**: optional objective value. When a copy reaches it, the rest are stopped.
+
+        The rest are also stopped when one copy proves optimality.
+        The winner is the copy with the best objective (see :py:attr:`sense`).
+
+        :return: the winner solver after solving, the output of its solve method, its log
+          and the status, objective and time of each seed for the log
+        """
+        seeds = config.get("seeds")
+        if seeds is None:
+            first_seed = config.get("seed", 0)
+            seeds = [first_seed + i for i in range(config["multiStart"])]
+        seeds = {str(seed): seed for seed in seeds}
+        runs = {
+            key: IsolatedRun(solver_class, inst, sol, dict(config, seed=seed))
+            for key, seed in seeds.items()
+        }
+        stop_when = reaches_target(config.get("targetObjective"), self.sense)
+        winner, results = run_parallel(runs, sense=self.sense, stop_when=stop_when)
+        result = results[winner]
+        algo = self._rebuild_solver(solver_class, inst, result)
+        info = dict(seed=seeds[winner], multi_start=summarize(results))
+        return algo, result["output"], result["log"], info
+
+    def _rebuild_solver(
+        self, solver_class: Type[ExperimentCore], inst: InstanceCore, result: Dict
+    ) -> ExperimentCore:
+        """
+        :param solver_class: the solver constructor
+        :param inst: the instance
+        :param result: the result of a solver that ran in another process
+        :return: a solver with the solution found in the other process
+        """
+        sol = None
+        if result["solution"] is not None:
+            sol = self.solution.from_dict(result["solution"])
+        return solver_class(inst, sol)
+
     def get_solver(self, name: str = "default") -> Union[Type[ExperimentCore], None]:
         """
         :param name: name of the solver to find
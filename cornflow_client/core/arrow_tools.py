@@ -0,0 +1,180 @@
+"""
+Read and write the data of instances and solutions as a directory of parquet files
+"""
+# Full imports
+import json
+import os
+import warnings
+
+# Partial imports
+from typing import Dict, List, Tuple, Union
+
+# Imports from internal modules
+from .columnar import (
+    ColumnarTable,
+    get_column_names,
+    get_column_type,
+    get_table_schemas,
+)
+
+# file with the tables that are not tables of records (e.g. parameters)
+OTHER_TABLES_FILE = "tables.json"
+PARQUET_EXTENSION = ".parquet"
+# key of the metadata of a table with the columns that some records do not have.
+# Each of them has a boolean column, MISSING_PREFIX + name, that is True in those records
+MISSING_METADATA = b"cornflow.missing"
+MISSING_PREFIX = "__missing__."
+
+
+def import_pyarrow():
+    """
+    :return: the pyarrow and pyarrow.parquet modules
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except (ModuleNotFoundError, ImportError):
+        warnings.warn("You must install pyarrow package to use this method")
+        raise Exception("You must install pyarrow package to use this method")
+    return pyarrow, pyarrow.parquet
+
+
+def get_arrow_type(column_schema: Union[dict, None]):
+    """
+    :param column_schema: json-schema of a column
+    :return: the arrow type of the column, None if it has to be inferred from the values
+    """
+    pa, _ = import_pyarrow()
+    types = dict(
+        integer=pa.int64(), number=pa.float64(), boolean=pa.bool_(), string=pa.string()
+    )
+    return types.get(get_column_type(column_schema))
+
+
+def records_to_arrow(records: List[dict], table_schema: dict = None):
+    """
+    :param records: a list of dictionaries
+    :param table_schema: json-schema of the records
+    :return: a pyarrow Table with the columns of the schema, in order,
+      followed by the rest of the keys of the records.
+      The records that do not have a column are marked in a separate boolean column
+      (see :py:func:`split_missing`).
+    """
+    pa, _ = import_pyarrow()
+    properties = (table_schema or dict()).get("properties", dict())
+    arrays = dict()
+    masks = dict()
+    for name in get_column_names(records, properties):
+        values = [record.get(name) for record in records]
+        arrow_type = get_arrow_type(properties.get(name))
+        try:
+            arrays[name] = pa.array(values, type=arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, OverflowError):
+            # values that do not match the schema: the type is inferred
+            arrays[name] = pa.array(values)
+        absent = [name not in record for record in records]
+        if any(absent):
+            masks[MISSING_PREFIX + name] = pa.array(absent, type=pa.bool_())
+    table = pa.table(dict(arrays, **masks))
+    if masks:
+        missing = [name[len(MISSING_PREFIX) :] for name in masks]
+        table = table.replace_schema_metadata({MISSING_METADATA: json.dumps(missing)})
+    return table
+
+
+def split_missing(table) -> Tuple:
+    """
+    :param table: a pyarrow Table written by :py:func:`records_to_arrow`
+    :return: the table without the columns of missing values, and a dictionary with
+      a boolean numpy array for each column that some records do not have,
+      True in those records
+    """
+    metadata = table.schema.metadata or dict()
+    if MISSING_METADATA not in metadata:
+        return table, dict()
+    missing = dict()
+    for name in json.loads(metadata[MISSING_METADATA]):
+        missing[name] = table.column(MISSING_PREFIX + name).to_numpy()
+    masks = {MISSING_PREFIX + name for name in missing}
+    # select instead of drop_columns, which needs a recent version of pyarrow
+    table = table.select([n for n in table.column_names if n not in masks])
+    return table, missing
+
+
+def arrow_to_records(table) -> List[dict]:
+    """
+    :param table: a pyarrow Table
+    :return: a list of dictionaries. The null values are None, except in the records that
+      did not have the column when they were written, which are left without it.
+    """
+    table, missing = split_missing(table)
+    records = table.to_pylist()
+    for name, mask in missing.items():
+        for position in mask.nonzero()[0].tolist():
+            del records[position][name]
+    return records
+
+
+def write_parquet(data: dict, path: str, schema: dict = None) -> None:
+    """
+    Writes each table of records into a parquet file in the directory path.
+    The rest of the tables (e.g. parameters) are written together in a json file.
+
+    :param data: data in json format
+    :param path: path of the directory. It is created if it does not exist.
+    :param schema: json-schema of the data, used to give a type to the columns
+    """
+    _, pq = import_pyarrow()
+    os.makedirs(path, exist_ok=True)
+    table_schemas = get_table_schemas(schema or dict())
+    others = dict()
+    for name, content in data.items():
+        is_records = isinstance(content, list) and all(
+            isinstance(record, dict) for record in content
+        )
+        if is_records and (content or name in table_schemas):
+            table = records_to_arrow(content, table_schemas.get(name))
+            pq.write_table(table, os.path.join(path, name + PARQUET_EXTENSION))
+        else:
+            others[name] = content
+    with open(os.path.join(path, OTHER_TABLES_FILE), "w") as f:
+        json.dump(others, f)
+
+
+def read_parquet(
+    path: str,
+    tables: List[str] = None,
+    memory_map: bool = True,
+    columnar: bool = False,
+) -> Dict:
+    """
+    Reads a directory written by :py:func:`write_parquet`.
+
+    :param path: path of the directory
+    :param tables: names of the tables to read. All of them by default.
+    :param memory_map: if True, the parquet files are memory-mapped instead of read into memory
+    :param columnar: if True, the tables of records are returned as :py:class:`ColumnarTable`
+      instead of lists of dictionaries
+    :return: a dictionary with the tables
+    """
+    _, pq = import_pyarrow()
+    data = dict()
+    other_path = os.path.join(path, OTHER_TABLES_FILE)
+    if os.path.exists(other_path):
+        with open(other_path, "r") as f:
+            data = json.load(f)
+    for filename in sorted(os.listdir(path)):
+        if filename.endswith(PARQUET_EXTENSION):
+            name = filename[: -len(PARQUET_EXTENSION)]
+            if tables is not None and name not in tables:
+                continue
+            table = pq.read_table(
+                os.path.join(path, filename), memory_map=memory_map
+            )
+            if columnar:
+                data[name] = ColumnarTable.from_arrow(*split_missing(table))
+            else:
+                data[name] = arrow_to_records(table)
+    if tables is not None:
+        data = {name: content for name, content in data.items() if name in tables}
+    return data
@@ -0,0 +1,248 @@
+"""
+Benchmark the solvers of an application over its test cases
+"""
+# Full imports
+import csv
+import json
+
+# Partial imports
+from typing import Dict, List, Union
+
+# Imports from internal modules
+from cornflow_client.constants import SENSE_MINIMIZE
+
+BENCHMARK_FIELDS = [
+    "case",
+    "solver",
+    "repetition",
+    "seed",
+    "status",
+    "status_code",
+    "sol_code",
+    "objective",
+    "time",
+    "wall_time",
+    "checks",
+    "instance_checks",
+    "peak_rss",
+    "error",
+]
+
+
+def count_checks(checks: Union[Dict, None]) -> int:
+    """
+    :param checks: the checks returned by a solve
+    :return: the number of errors in the checks
+    """
+    if not checks:
+        return 0
+    total = 0
+    for value in checks.values():
+        try:
+            total += len(value)
+        except TypeError:
+            total += 1
+    return total
+
+
+def get_case_instance(case: Union[Dict, tuple]) -> Dict:
+    """
+    :param case: a test case of an application
+    :return: the instance data of the test case
+    """
+    if isinstance(case, tuple):
+        return case[0]
+    return case
+
+
+def run_benchmark(
+    app,
+    solvers: List[str] = None,
+    cases: List[int] = None,
+    repetitions: int = 1,
+    seeds: List[int] = None,
+    config: dict = None,
+    max_workers: int = None,
+) -> List[Dict]:
+    """
+    Solves every test case of the application with every solver.
+    The solves run in parallel with :py:meth:`ApplicationCore.solve_many`.
+
+    :param app: the application
+    :param solvers: names of the solvers to run. All of them by default.
+    :param cases: positions of the test cases to run. All of them by default.
+    :param repetitions: number of times each case is solved with each solver
+    :param seeds: optional list of seeds, one per repetition. The seed is passed to the solver
+      with the configuration key seed.
+    :param config: base configuration for all the solves
+    :param max_workers: maximum number of processes
+    :return: a list with one record per solve (see BENCHMARK_FIELDS)
+    """
+    if solvers is None:
+        solvers = list(app.solvers.keys())
+    test_cases = app.test_cases
+    if cases is None:
+        cases = list(range(len(test_cases)))
+    if seeds is None:
+        seeds = [None] * repetitions
+    base_config = dict(msg=False)
+    base_config.update(config or dict())
+
+    tasks = []
+    for case in cases:
+        for solver in solvers:
+            for repetition, seed in enumerate(seeds):
+                task_config = dict(base_config, solver=solver)
+                if seed is not None:
+                    task_config["seed"] = seed
+                tasks.append((case, solver, repetition, seed, task_config))
+
+    datasets = [get_case_instance(test_cases[task[0]]) for task in tasks]
+    configs = [task[4] for task in tasks]
+    records = [None] * len(tasks)
+    results = app.solve_many(datasets, configs, max_workers=max_workers)
+    for index, result, error in results:
+        case, solver, repetition, seed, _ = tasks[index]
+        record = {field: None for field in BENCHMARK_FIELDS}
+        record.update(case=case, solver=solver, repetition=repetition, seed=seed)
+        if error is not None:
+            record["error"] = repr(error)
+        else:
+            record.update(get_record(app, solver, datasets[index], result))
+        records[index] = record
+    return records
+
+
+def get_record(app, solver: str, data: dict, result: tuple) -> Dict:
+    """
+    :param app: the application
+    :param solver: name of the solver
+    :param data: the instance data
+    :param result: the output of the solve method
+    :return: the measures of the solve
+    """
+    solution, checks, instance_checks, _, log = result
+    profile = log.get("profile", dict())
+    record = dict(
+        status=log.get("status"),
+        status_code=log.get("status_code"),
+        sol_code=log.get("sol_code"),
+        time=log.get("time"),
+        wall_time=sum(phase["wall"] for phase in profile.get("phases", {}).values()),
+        checks=count_checks(checks),
+        instance_checks=count_checks(instance_checks),
+        peak_rss=profile.get("peak_rss"),
+        error=log.get("error"),
+    )
+    if solution:
+        # the objective is evaluated again from the solution returned by the solve
+        try:
+            algo = app.get_solver(solver)(
+                app.instance.from_dict(data), app.solution.from_dict(solution)
+            )
+            record["objective"] = algo.get_objective()
+        except Exception:
+            record["objective"] = None
+    return record
+
+
+def write_benchmark_json(records: List[Dict], path: str) -> None:
+    """
+    :param records: the records returned by :py:func:`run_benchmark`
+    :param path: path of the json file
+    """
+    with open(path, "w") as f:
+        json.dump(records, f, indent=4)
+
+
+def read_benchmark_json(path: str) -> List[Dict]:
+    """
+    :param path: path of a json file written by :py:func:`write_benchmark_json`
+    :return: the records
+    """
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_benchmark_csv(records: List[Dict], path: str) -> None:
+    """
+    :param records: the records returned by :py:func:`run_benchmark`
+    :param path: path of the csv file
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=BENCHMARK_FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def summarize_benchmark(records: List[Dict]) -> Dict[tuple, Dict]:
+    """
+    :param records: the records of a benchmark
+    :return: for each pair (case, solver), the mean time, the mean objective,
+      the number of errors and the status codes found
+    """
+    groups = dict()
+    for record in records:
+        groups.setdefault((record["case"], record["solver"]), []).append(record)
+    summary = dict()
+    for key, group in groups.items():
+        times = [r["time"] for r in group if r["time"] is not None]
+        objectives = [r["objective"] for r in group if r["objective"] is not None]
+        summary[key] = dict(
+            time=sum(times) / len(times) if times else None,
+            objective=sum(objectives) / len(objectives) if objectives else None,
+            errors=len([r for r in group if r["error"] is not None]),
+            status_codes=sorted({r["status_code"] for r in group}, key=str),
+        )
+    return summary
+
+
+def compare_benchmarks(
+    old: List[Dict],
+    new: List[Dict],
+    time_tolerance: float = 0.1,
+    objective_tolerance: float = 1e-6,
+    sense: int = SENSE_MINIMIZE,
+) -> List[Dict]:
+    """
+    Compares two benchmarks of the same application (e.g. two versions) and returns the regressions.
+
+    :param old: the records of the reference benchmark
+    :param new: the records of the new benchmark
+    :param time_tolerance: relative increase of the mean time that is considered a regression
+    :param objective_tolerance: absolute worsening of the mean objective that is considered a regression
+    :param sense: SENSE_MINIMIZE or SENSE_MAXIMIZE
+    :return: a list with one element per regression, with the case, the solver,
+      the metric and the old and new values
+    """
+    old_summary = summarize_benchmark(old)
+    new_summary = summarize_benchmark(new)
+    regressions = []
+
+    def add(key, metric, old_value, new_value):
+        regressions.append(
+            dict(
+                case=key[0], solver=key[1], metric=metric, old=old_value, new=new_value
+            )
+        )
+
+    for key, new_values in new_summary.items():
+        old_values = old_summary.get(key)
+        if old_values is None:
+            continue
+        if old_values["time"] is not None and new_values["time"] is not None:
+            if new_values["time"] > old_values["time"] * (1 + time_tolerance):
+                add(key, "time", old_values["time"], new_values["time"])
+        if old_values["objective"] is not None:
+            if new_values["objective"] is None:
+                add(key, "objective", old_values["objective"], None)
+            elif (
+                sense * (new_values["objective"] - old_values["objective"])
+                > objective_tolerance
+            ):
+                add(key, "objective", old_values["objective"], new_values["objective"])
+        if new_values["errors"] > old_values["errors"]:
+            add(key, "errors", old_values["errors"], new_values["errors"])
+        if new_values["status_codes"] != old_values["status_codes"]:
+            add(key, "status", old_values["status_codes"], new_values["status_codes"])
+    return regressions
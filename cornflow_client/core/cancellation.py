@@ -0,0 +1,90 @@
+"""
+Cooperative cancellation of a running solver.
+
+The stop can be requested from another thread (e.g. a thread that polls the status of the execution),
+by a signal (SIGTERM) or by creating a stop file.
+The solvers check it with :py:meth:`ExperimentCore.should_stop` and return their best solution.
+"""
+# Full imports
+import os
+import signal
+import threading
+
+# Partial imports
+from timeit import default_timer as timer
+from typing import Union
+
+_stop_event = threading.Event()
+_stop_file = dict(path=None, interval=0.5, last_check=0)
+
+
+def request_stop() -> None:
+    """
+    Asks the running solvers of this process to stop
+    """
+    _stop_event.set()
+
+
+def clear_stop() -> None:
+    """
+    Forgets a previous stop request
+    """
+    _stop_event.clear()
+
+
+def stop_requested() -> bool:
+    """
+    Cheap check to be called by the solvers as often as needed.
+    The stop file, if any, is checked at most once every interval seconds.
+
+    :return: True if the solvers of this process have been asked to stop
+    """
+    if _stop_event.is_set():
+        return True
+    path = _stop_file["path"]
+    if path is None:
+        return False
+    now = timer()
+    if now - _stop_file["last_check"] < _stop_file["interval"]:
+        return False
+    _stop_file["last_check"] = now
+    if os.path.exists(path):
+        _stop_event.set()
+        return True
+    return False
+
+
+def set_stop_file(path: Union[str, None], interval: float = 0.5) -> None:
+    """
+    :param path: a stop is requested when a file exists in this path. None to stop watching.
+    :param interval: minimum seconds between two checks of the file
+    """
+    _stop_file.update(path=path, interval=interval, last_check=0)
+
+
+def _handle_signal(signum, frame) -> None:
+    request_stop()
+
+
+def install_signal_handler(signum: int = signal.SIGTERM):
+    """
+    Requests a stop when the process receives the signal, instead of being killed.
+    Signal handlers can only be installed from the main thread.
+
+    :param signum: the signal to handle
+    :return: the previous handler, to restore it with :py:func:`restore_signal_handler`.
+      None if the handler could not be installed.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return None
+    return signal.signal(signum, _handle_signal)
+
+
+def restore_signal_handler(previous, signum: int = signal.SIGTERM) -> None:
+    """
+    :param previous: the handler returned by :py:func:`install_signal_handler`
+    :param signum: the signal
+    """
+    if previous is None or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signum, previous)
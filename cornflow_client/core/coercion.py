@@ -0,0 +1,169 @@
+"""
+Conversion of the values read from files to the types of the json-schema.
+
+The values are converted by columns: the conversion is chosen once for each column,
+from its type in the schema and the types of the values it contains.
+"""
+# Full imports
+import math
+import numbers
+
+# Partial imports
+from typing import Callable, Dict, List, Sequence, Union
+
+TRUE_STRINGS = {"TRUE", "True", "true"}
+FALSE_STRINGS = {"FALSE", "False", "false"}
+
+
+def format_value(value):
+    """
+    Default conversion of a value read from a file, when the type of its column is not known:
+    NaN becomes None, the strings TRUE and FALSE become booleans
+    and the values that are not numbers become strings.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if value in ["TRUE", "True"]:
+            return True
+        if value in ["FALSE", "False"]:
+            return False
+        return value
+    if isinstance(value, bool):
+        return value
+
+    if not isinstance(value, numbers.Number):
+        return str(value)
+    if math.isnan(value):
+        return None
+    return value
+
+
+def get_target_type(column_schema: Union[dict, None]) -> Union[str, None]:
+    """
+    :param column_schema: json-schema of a column
+    :return: the type of the column ignoring null, None if it is not known or there are several
+    """
+    types = (column_schema or dict()).get("type")
+    if not isinstance(types, list):
+        types = [types]
+    types = [t for t in types if t != "null"]
+    if len(types) != 1:
+        return None
+    return types[0]
+
+
+def to_integer(value):
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            return int(value)
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            return format_value(value)
+    return format_value(value)
+
+
+def to_number(value):
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return format_value(value)
+        if math.isnan(number):
+            return None
+        return int(number) if number.is_integer() and "." not in value else number
+    return format_value(value)
+
+
+def to_boolean(value):
+    if isinstance(value, str):
+        if value in TRUE_STRINGS:
+            return True
+        if value in FALSE_STRINGS:
+            return False
+        return value
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return bool(value)
+    return format_value(value)
+
+
+def to_string(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def drop_nan(value):
+    return None if value != value else value
+
+
+CONVERTERS = dict(
+    integer=to_integer, number=to_number, boolean=to_boolean, string=to_string
+)
+
+# types of values that are already valid for each type of the schema
+VALID_TYPES = dict(
+    integer={int, type(None)},
+    number={int, type(None)},
+    boolean={bool, type(None)},
+    string={str, type(None)},
+)
+
+
+def get_coercer(column_schema: Union[dict, None]) -> Callable:
+    """
+    :param column_schema: json-schema of a column
+    :return: a function that converts one value to the type of the column
+    """
+    return CONVERTERS.get(get_target_type(column_schema), format_value)
+
+
+def coerce_column(values: Sequence, column_schema: Union[dict, None] = None) -> List:
+    """
+    Converts all the values of a column to the type of the column.
+    Columns whose values all have the same type are converted in one pass without checking each value.
+    Only the columns with mixed types are converted value by value.
+
+    :param values: the values of the column
+    :param column_schema: json-schema of the column
+    :return: the converted values
+    """
+    target = get_target_type(column_schema)
+    kinds = set(map(type, values))
+    if kinds <= VALID_TYPES.get(target, {str, int, bool, type(None)}) and (
+        target is not None or str not in kinds
+    ):
+        # nothing to convert
+        return list(values)
+    if target in ["number", None] and kinds <= {float, int, type(None)}:
+        # only NaN has to be converted
+        return list(map(drop_nan, values))
+    if target == "string" and kinds <= {int, type(None)}:
+        return [None if value is None else str(value) for value in values]
+    return list(map(get_coercer(column_schema), values))
+
+
+def coerce_records(
+    columns: Dict[str, Sequence], table_schema: Union[dict, None] = None
+) -> List[Dict]:
+    """
+    :param columns: a dictionary with the values of each column
+    :param table_schema: json-schema of the records
+    :return: a list of records with the values converted to the types of the schema
+    """
+    properties = (table_schema or dict()).get("properties", dict())
+    names = list(columns)
+    converted = [coerce_column(columns[name], properties.get(name)) for name in names]
+    return [dict(zip(names, row)) for row in zip(*converted)]
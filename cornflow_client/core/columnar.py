@@ -0,0 +1,318 @@
+"""
+Columnar storage for the tables of an instance or a solution.
+
+Each table of records is stored as one NumPy array per column instead of one dictionary per row.
+"""
+# Full imports
+import warnings
+
+# Partial imports
+from pytups import SuperDict
+from typing import Dict, Iterator, List, Union
+
+# json-schema types stored in typed arrays
+NUMPY_TYPES = dict(integer="int64", number="float64", boolean="bool")
+# number of rows converted at a time when iterating a table
+ITER_CHUNK_SIZE = 4096
+
+
+def import_numpy():
+    """
+    :return: the numpy module
+    """
+    try:
+        import numpy
+    except (ModuleNotFoundError, ImportError):
+        warnings.warn("You must install numpy package to use the columnar storage")
+        raise Exception("You must install numpy package to use the columnar storage")
+    return numpy
+
+
+def get_column_type(schema: Union[dict, None]) -> Union[str, None]:
+    """
+    :param schema: json-schema of a column
+    :return: the json-schema type of the column, None if it has several types
+    """
+    if not schema:
+        return None
+    types = schema.get("type")
+    if isinstance(types, list):
+        return types[0] if len(types) == 1 else None
+    return types
+
+
+def is_of_type(value, column_type: str) -> bool:
+    """
+    :param value: a value of a column
+    :param column_type: json-schema type of the column
+    :return: True if the value can be stored in the typed array without being changed
+    """
+    if column_type == "boolean":
+        return isinstance(value, bool)
+    if isinstance(value, bool):
+        return False
+    if column_type == "integer":
+        return isinstance(value, int) and -(2**63) <= value < 2**63
+    return isinstance(value, (int, float))
+
+
+def get_number_dtype(values: list):
+    """
+    :param values: the values of a number column
+    :return: the dtype of the array that keeps them unchanged: float64 if they are all floats,
+      int64 if they are all integers that fit in it, object otherwise (e.g. 1 and 2.5)
+    """
+    if all(isinstance(value, float) for value in values):
+        return "float64"
+    if all(is_of_type(value, "integer") for value in values):
+        return "int64"
+    return object
+
+
+def get_column_names(records: List[dict], properties: dict) -> List[str]:
+    """
+    :param records: a list of dictionaries
+    :param properties: json-schema of the columns
+    :return: the columns of the schema, in order, followed by the rest of the keys of the records
+    """
+    names = list(properties)
+    seen = set(names)
+    for record in records:
+        for name in record:
+            if name not in seen:
+                seen.add(name)
+                names.append(name)
+    return names
+
+
+class ColumnarTable:
+    """
+    A table of records stored by columns.
+    The columns with a numeric or boolean type in the json-schema are stored in typed arrays,
+    the rest in arrays of python objects. A column falls back to an array of objects
+    if one of its values does not fit its type (e.g. a null).
+
+    The records are only built when they are accessed: by position, by iterating
+    or with :py:meth:`to_records`.
+    """
+
+    def __init__(self, columns: Dict, size: int, missing: Dict = None):
+        """
+        :param columns: a dictionary with one array per column
+        :param size: the number of rows
+        :param missing: for the columns that some records do not have,
+          a boolean array that is True in those records
+        """
+        self.columns = columns
+        self.missing = missing or dict()
+        self._size = size
+
+    @classmethod
+    def from_records(
+        cls, records: List[dict], schema: dict = None
+    ) -> "ColumnarTable":
+        """
+        :param records: a list of dictionaries
+        :param schema: json-schema of the records (the items of the table)
+        :return: the table
+        """
+        np = import_numpy()
+        properties = (schema or dict()).get("properties", dict())
+        names = get_column_names(records, properties)
+        columns = dict()
+        missing = dict()
+        for name in names:
+            absent = [name not in record for record in records]
+            values = [record.get(name) for record in records]
+            present = [value for value, a in zip(values, absent) if not a]
+            column_type = get_column_type(properties.get(name))
+            dtype = NUMPY_TYPES.get(column_type, object)
+            if dtype is not object and not all(
+                is_of_type(value, column_type) for value in present
+            ):
+                dtype = object
+            if dtype == "float64":
+                # a number column with only integers keeps them as integers
+                dtype = get_number_dtype(present)
+            if any(absent):
+                missing[name] = np.array(absent, dtype=bool)
+                if dtype is not object:
+                    values = [0 if a else value for value, a in zip(values, absent)]
+            if dtype is object:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+            else:
+                column = np.array(values, dtype=dtype)
+            columns[name] = column
+        return cls(columns, len(records), missing)
+
+    @classmethod
+    def from_arrow(cls, table, missing: Dict = None) -> "ColumnarTable":
+        """
+        :param table: a pyarrow Table
+        :param missing: for the columns that some records do not have,
+          a boolean array that is True in those records
+        :return: the table. The numeric columns without nulls share the memory of the arrow table.
+          The null values are None, except in the records without the column.
+        """
+        np = import_numpy()
+        import pyarrow as pa
+
+        columns = dict()
+        missing = dict(missing or dict())
+        for name, column in zip(table.column_names, table.columns):
+            column = (
+                column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+            )
+            is_bool = pa.types.is_boolean(column.type)
+            typed = (
+                is_bool
+                or pa.types.is_integer(column.type)
+                or pa.types.is_floating(column.type)
+            )
+            if column.null_count:
+                nulls = column.is_null().to_numpy(zero_copy_only=False)
+                absent = missing.get(name)
+                if absent is None or (nulls & ~absent).any():
+                    # some records have a null value: the column keeps python objects
+                    typed = False
+                elif typed:
+                    column = column.fill_null(False if is_bool else 0)
+            if typed:
+                values = column.to_numpy(zero_copy_only=False)
+            else:
+                values = np.empty(len(column), dtype=object)
+                values[:] = column.to_pylist()
+            columns[name] = values
+        return cls(columns, table.num_rows, missing)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, position: int) -> dict:
+        """
+        :param position: position of the row
+        :return: the record in that position
+        """
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError("table index out of range")
+        return {
+            name: (
+                column[position] if column.dtype == object else column[position].item()
+            )
+            for name, column in self.columns.items()
+            if name not in self.missing or not self.missing[name][position]
+        }
+
+    def __iter__(self) -> Iterator[dict]:
+        """
+        :return: the records, built a chunk of rows at a time
+        """
+        names = list(self.columns)
+        for start in range(0, self._size, ITER_CHUNK_SIZE):
+            stop = min(start + ITER_CHUNK_SIZE, self._size)
+            values = [self.columns[name][start:stop].tolist() for name in names]
+            missing = [
+                (
+                    self.missing[name][start:stop].tolist()
+                    if name in self.missing
+                    else None
+                )
+                for name in names
+            ]
+            if names and all(mask is None for mask in missing):
+                yield from (dict(zip(names, row)) for row in zip(*values))
+                continue
+            for position in range(stop - start):
+                yield {
+                    name: values[i][position]
+                    for i, name in enumerate(names)
+                    if missing[i] is None or not missing[i][position]
+                }
+
+    def column(self, name: str):
+        """
+        :param name: name of the column
+        :return: the array of the column. The values of the records without the column
+          are meaningless (see missing).
+        """
+        return self.columns[name]
+
+    def to_records(self) -> List[dict]:
+        """
+        :return: the table as a list of dictionaries with python values
+        """
+        return list(self)
+
+    def copy(self) -> "ColumnarTable":
+        """
+        :return: a copy of the table, with copies of its arrays
+        """
+        return ColumnarTable(
+            {name: column.copy() for name, column in self.columns.items()},
+            self._size,
+            {name: mask.copy() for name, mask in self.missing.items()},
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: the memory used by the arrays (without the python objects they reference)
+        """
+        return sum(column.nbytes for column in self.columns.values()) + sum(
+            mask.nbytes for mask in self.missing.values()
+        )
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ColumnarTable):
+            other = other.to_records()
+        return self.to_records() == other
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable(rows={self._size}, columns={list(self.columns)})"
+
+
+def get_table_schemas(schema: dict) -> Dict[str, dict]:
+    """
+    :param schema: json-schema of an instance or a solution
+    :return: the json-schema of the records of each table of records
+    """
+    tables = dict()
+    for name, content in schema.get("properties", dict()).items():
+        items = content.get("items", dict())
+        if content.get("type") == "array" and items.get("type") == "object":
+            tables[name] = items
+    return tables
+
+
+def to_columnar(data: dict, schema: dict) -> SuperDict:
+    """
+    :param data: data of an instance or a solution, in json format
+    :param schema: its json-schema
+    :return: the data with the tables of records stored by columns
+    """
+    tables = get_table_schemas(schema)
+    result = SuperDict()
+    for name, content in data.items():
+        if isinstance(content, ColumnarTable):
+            result[name] = content
+        elif name in tables and isinstance(content, list):
+            result[name] = ColumnarTable.from_records(content, tables[name])
+        elif isinstance(content, dict):
+            result[name] = SuperDict.from_dict(content)
+        else:
+            result[name] = content
+    return result
+
+
+def from_columnar(data: dict) -> dict:
+    """
+    :param data: data with tables stored by columns
+    :return: the data in json format
+    """
+    return {
+        name: content.to_records() if isinstance(content, ColumnarTable) else content
+        for name, content in data.items()
+    }
@@ -0,0 +1,150 @@
+"""
+Compiled instances: instances already parsed and precomputed, stored in binary files
+to be reused by other executions with the same data
+"""
+# Full imports
+import mmap
+import os
+import pickle
+import time
+
+# Partial imports
+from typing import Any, Union
+
+# Imports from internal modules
+from .fingerprint import get_fingerprint
+
+ARTIFACT_EXTENSION = ".pkl"
+BUFFERS_EXTENSION = ".buf"
+# the out-of-band buffers are aligned so the arrays read from them are aligned too
+BUFFER_ALIGNMENT = 64
+# protocol 5 (python 3.8+) is needed for the out-of-band buffers
+PICKLE_PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 5)
+
+
+def get_class_version(instance_class: type) -> str:
+    """
+    :param instance_class: the class of the instance
+    :return: a hash of the compiled_version and the schema of the class,
+      so the instances compiled by another version of the class are not loaded
+    """
+    schema = getattr(instance_class, "schema", None)
+    if not isinstance(schema, dict):
+        schema = None
+    version = getattr(instance_class, "compiled_version", None)
+    return get_fingerprint([str(version), schema])[:16]
+
+
+def get_artifact_path(directory: str, instance_class: type, content_hash: str) -> str:
+    """
+    :param directory: directory of the compiled instances
+    :param instance_class: the class of the instance
+    :param content_hash: fingerprint of the data of the instance
+    :return: path of the compiled instance, without extension
+    """
+    name = (
+        f"{instance_class.__module__}.{instance_class.__qualname__}."
+        f"{get_class_version(instance_class)}.{content_hash}"
+    )
+    return os.path.join(directory, name)
+
+
+def write_artifact(obj: Any, path: str) -> None:
+    """
+    Writes an object with pickle protocol 5. The large buffers (e.g. numpy arrays)
+    are written out-of-band into a separate file, so they can be memory-mapped when read.
+    Without protocol 5, everything is written in the main file with protocol 4.
+    Both files are replaced atomically.
+
+    :param obj: the object to write
+    :param path: path of the files, without extension
+    """
+    buffers = []
+    if PICKLE_PROTOCOL >= 5:
+        payload = pickle.dumps(
+            obj, protocol=PICKLE_PROTOCOL, buffer_callback=buffers.append
+        )
+    else:
+        payload = pickle.dumps(obj, protocol=PICKLE_PROTOCOL)
+    offsets = []
+    position = 0
+    buffers_path = path + BUFFERS_EXTENSION
+    artifact_path = path + ARTIFACT_EXTENSION
+    # several processes may write the same artifact at the same time
+    suffix = f".{os.getpid()}.tmp"
+    with open(buffers_path + suffix, "wb") as f:
+        for buffer in buffers:
+            raw = buffer.raw()
+            padding = -position % BUFFER_ALIGNMENT
+            f.write(b"\0" * padding)
+            position += padding
+            offsets.append((position, raw.nbytes))
+            f.write(raw)
+            position += raw.nbytes
+    with open(artifact_path + suffix, "wb") as f:
+        pickle.dump(dict(offsets=offsets, payload=payload), f, protocol=PICKLE_PROTOCOL)
+    os.replace(buffers_path + suffix, buffers_path)
+    os.replace(artifact_path + suffix, artifact_path)
+    now = time.time_ns()
+    os.utime(artifact_path, ns=(now, now))
+
+
+def read_artifact(path: str) -> Union[Any, None]:
+    """
+    Reads an object written by :py:func:`write_artifact`.
+    The out-of-band buffers are memory-mapped (copy-on-write) instead of read into memory.
+
+    :param path: path of the files, without extension
+    :return: the object, None if there is no valid artifact in the path
+    """
+    try:
+        with open(path + ARTIFACT_EXTENSION, "rb") as f:
+            header = pickle.load(f)
+        offsets = header["offsets"]
+        if offsets:
+            with open(path + BUFFERS_EXTENSION, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            view = memoryview(mapped)
+            buffers = [view[start : start + size] for start, size in offsets]
+            obj = pickle.loads(header["payload"], buffers=buffers)
+        else:
+            obj = pickle.loads(header["payload"])
+        # the artifact becomes the most recently used
+        now = time.time_ns()
+        os.utime(path + ARTIFACT_EXTENSION, ns=(now, now))
+    except (OSError, EOFError, ValueError, KeyError, pickle.UnpicklingError):
+        return None
+    return obj
+
+
+def evict_artifacts(directory: str, max_size: int) -> None:
+    """
+    Removes the least recently used artifacts until the directory fits in max_size.
+    The time of last use of an artifact is the modification time of its main file.
+
+    :param directory: directory of the artifacts
+    :param max_size: maximum size of the artifacts, in bytes
+    """
+    artifacts = dict()
+    for filename in os.listdir(directory):
+        name, extension = os.path.splitext(filename)
+        if extension not in (ARTIFACT_EXTENSION, BUFFERS_EXTENSION):
+            continue
+        try:
+            stat = os.stat(os.path.join(directory, filename))
+        except OSError:
+            continue
+        last_use, size = artifacts.get(name, (0, 0))
+        if extension == ARTIFACT_EXTENSION:
+            last_use = stat.st_mtime_ns
+        artifacts[name] = last_use, size + stat.st_size
+    total = sum(size for _, size in artifacts.values())
+    for last_use, size, name in sorted((*v, name) for name, v in artifacts.items()):
+        if total <= max_size:
+            break
+        for extension in (ARTIFACT_EXTENSION, BUFFERS_EXTENSION):
+            try:
+                os.remove(os.path.join(directory, name + extension))
+            except OSError:
+                pass
+        total -= size
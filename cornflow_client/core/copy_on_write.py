@@ -0,0 +1,296 @@
+"""
+Copy-on-write views of the data of instances and solutions, to clone them cheaply.
+
+Two views over the same data share its tables and records. A view copies a nested dictionary
+or list the first time it is reached through it (by key, by position or by iterating),
+so it can be modified without changing the data seen by the other views.
+The tables and records that are never reached are never copied.
+The records (and the rest of the dictionaries and lists without other dictionaries or lists
+inside) are copied as they are; the rest become views themselves.
+"""
+# Partial imports
+from pytups import SuperDict, TupList
+
+# Imports from internal modules
+from .columnar import ColumnarTable
+
+SCALAR_TYPES = frozenset([str, int, float, bool, type(None)])
+
+
+def share(value):
+    """
+    :param value: any value
+    :return: a new view over the value if it is a dictionary or a list with other dictionaries
+      or lists inside, a copy if it is a dictionary or a list of scalars (e.g. a record)
+      or a :py:class:`ColumnarTable`, the value itself otherwise
+    """
+    if type(value) is dict and SCALAR_TYPES.issuperset(map(type, value.values())):
+        return value.copy()
+    if isinstance(value, dict):
+        if SCALAR_TYPES.issuperset(map(type, dict.values(value))):
+            copy = type(value)()
+            dict.update(copy, dict.items(value))
+            return copy
+        return CowDict.share(value)
+    if isinstance(value, list):
+        if SCALAR_TYPES.issuperset(map(type, list.__iter__(value))):
+            return type(value)(list.__iter__(value))
+        return CowList.share(value)
+    if isinstance(value, ColumnarTable):
+        return value.copy()
+    return value
+
+
+def is_container(value) -> bool:
+    return isinstance(value, (dict, list, ColumnarTable))
+
+
+class CowDict(SuperDict):
+    """
+    A SuperDict that shares its values with other views until they are reached.
+
+    The values reached through the view (or assigned to it) are owned by the view.
+    The rest are shared, and are copied the first time they are reached.
+    Like in :py:class:`LazySuperDict`, the values are reached through the methods of the view
+    (e.g. d[key], d.get(key), d.items(), d.values() and the methods of SuperDict that use them),
+    not through the functions that read the dictionary directly (e.g. json.dumps),
+    which see the shared values without changing them.
+    """
+
+    # _owned: the ids of the containers owned by the view while some values are shared
+    __slots__ = ("_owned",)
+
+    @classmethod
+    def share(cls, data: dict) -> "CowDict":
+        """
+        :param data: a dictionary
+        :return: a view that shares the values of the dictionary
+        """
+        if type(data) is dict:
+            view = cls(data)
+        else:
+            view = cls()
+            # the raw values, without converting them (e.g. in a LazySuperDict or another view)
+            dict.update(view, dict.items(data))
+        view._owned = set()
+        return view
+
+    @property
+    def shared(self) -> bool:
+        """
+        :return: True if some values may be shared with other views
+        """
+        return getattr(self, "_owned", None) is not None
+
+    def _own(self, key, value):
+        owned = getattr(self, "_owned", None)
+        if owned is None or not is_container(value) or id(value) in owned:
+            return value
+        value = share(value)
+        dict.__setitem__(self, key, value)
+        owned.add(id(value))
+        return value
+
+    def _own_all(self) -> None:
+        if not self.shared:
+            return
+        for key, value in dict.items(self):
+            self._own(key, value)
+        # all the values are owned now, and so are the values added later
+        self._owned = None
+
+    def _add_owned(self, value) -> None:
+        owned = getattr(self, "_owned", None)
+        if owned is not None and is_container(value):
+            owned.add(id(value))
+
+    def __getitem__(self, key):
+        return self._own(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def items(self):
+        self._own_all()
+        return dict.items(self)
+
+    def values(self):
+        self._own_all()
+        return dict.values(self)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._add_owned(value)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def pop(self, key, *args):
+        if key not in self:
+            return dict.pop(self, key, *args)
+        value = self[key]
+        dict.__delitem__(self, key)
+        return value
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        owned = getattr(self, "_owned", None)
+        if owned is not None and is_container(value) and id(value) not in owned:
+            value = share(value)
+        return key, value
+
+    def copy(self) -> "CowDict":
+        """
+        :return: a new view over the values of this one
+        """
+        view = CowDict.share(self)
+        # the values are shared now: both views copy them when they reach them
+        self._owned = set()
+        return view
+
+    __copy__ = copy
+
+    def __reduce__(self):
+        # the ids of the owned values are meaningless in another process
+        return SuperDict, (), None, None, iter(dict.items(self))
+
+
+class CowList(TupList):
+    """
+    A TupList that shares its elements with other views until they are reached.
+    See :py:class:`CowDict`.
+    """
+
+    # _owned: the ids of the containers owned by the view while some elements are shared
+    __slots__ = ("_owned",)
+
+    @classmethod
+    def share(cls, data: list) -> "CowList":
+        """
+        :param data: a list
+        :return: a view that shares the elements of the list
+        """
+        view = cls()
+        list.extend(view, list.__iter__(data))
+        view._owned = set()
+        return view
+
+    @property
+    def shared(self) -> bool:
+        """
+        :return: True if some elements may be shared with other views
+        """
+        return getattr(self, "_owned", None) is not None
+
+    def _own(self, position: int, value):
+        owned = getattr(self, "_owned", None)
+        if owned is None or not is_container(value) or id(value) in owned:
+            return value
+        value = share(value)
+        list.__setitem__(self, position, value)
+        owned.add(id(value))
+        return value
+
+    def _own_all(self) -> None:
+        owned = getattr(self, "_owned", None)
+        if owned is None:
+            return
+        list.__setitem__(
+            self,
+            slice(None),
+            [
+                value
+                if type(value) in SCALAR_TYPES or id(value) in owned
+                else share(value)
+                for value in list.__iter__(self)
+            ],
+        )
+        # all the elements are owned now, and so are the elements added later
+        self._owned = None
+
+    def _add_owned(self, values) -> None:
+        owned = getattr(self, "_owned", None)
+        if owned is None:
+            return
+        for value in values:
+            if is_container(value):
+                owned.add(id(value))
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            for position in range(*key.indices(len(self))):
+                self._own(position, list.__getitem__(self, position))
+            return TupList(list.__getitem__(self, key))
+        return self._own(key, list.__getitem__(self, key))
+
+    def __iter__(self):
+        self._own_all()
+        return list.__iter__(self)
+
+    def __reversed__(self):
+        self._own_all()
+        return list.__reversed__(self)
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            value = list(value)
+            list.__setitem__(self, key, value)
+            self._add_owned(value)
+            return
+        list.__setitem__(self, key, value)
+        self._add_owned([value])
+
+    def append(self, value) -> None:
+        list.append(self, value)
+        self._add_owned([value])
+
+    def insert(self, position: int, value) -> None:
+        list.insert(self, position, value)
+        self._add_owned([value])
+
+    def extend(self, values) -> None:
+        values = list(values)
+        list.extend(self, values)
+        self._add_owned(values)
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def pop(self, position: int = -1):
+        value = self[position]
+        list.__delitem__(self, position)
+        return value
+
+    def copy(self) -> "CowList":
+        """
+        :return: a new view over the elements of this one
+        """
+        view = CowList.share(self)
+        # the elements are shared now: both views copy them when they reach them
+        self._owned = set()
+        return view
+
+    __copy__ = copy
+
+    def __add__(self, values) -> "CowList":
+        view = CowList.share(list.__add__(self, values))
+        # the elements are shared now: both views copy them when they reach them
+        self._owned = set()
+        return view
+
+    def __reduce__(self):
+        # the ids of the owned elements are meaningless in another process
+        return TupList, (list(list.__iter__(self)),)
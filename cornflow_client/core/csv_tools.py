@@ -0,0 +1,170 @@
+"""
+Read and write the data of instances and solutions as a directory with one csv file per table
+"""
+# Full imports
+import csv
+import os
+import warnings
+
+# Partial imports
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pytups import SuperDict, TupList
+from typing import Dict, List
+
+# Imports from internal modules
+from .coercion import coerce_column, get_coercer, get_target_type
+from .columnar import get_column_names
+
+CSV_EXTENSION = ".csv"
+# columns without type in the schema: numbers are read as numbers and the rest as strings
+UNTYPED_COLUMN = dict(type="number")
+CSV_ENCODING = "utf-8"
+
+
+def get_empty_value(column_schema: dict = None):
+    """
+    :param column_schema: json-schema of a column
+    :return: the value of an empty cell: an empty string in the string columns, None otherwise
+    """
+    return "" if get_target_type(column_schema) == "string" else None
+
+
+def read_csv_table(path: str, table_schema: dict = None) -> TupList:
+    """
+    Reads a csv file with a header, row by row.
+    Empty values are read as None, except in the string columns, where they are empty strings.
+
+    :param path: path of the csv file
+    :param table_schema: json-schema of the records
+    :return: a list of records with the values converted to the types of the schema
+    """
+    properties = (table_schema or dict()).get("properties", dict())
+    with open(path, "r", newline="", encoding=CSV_ENCODING) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return TupList()
+        columns = [[] for _ in header]
+        empty_values = [get_empty_value(properties.get(name)) for name in header]
+        for row in reader:
+            if not row:
+                continue
+            for column, value, empty in zip(columns, row, empty_values):
+                column.append(value if value != "" else empty)
+            for column, empty in zip(columns[len(row) :], empty_values[len(row) :]):
+                column.append(empty)
+    columns = [
+        coerce_column(column, properties.get(name, UNTYPED_COLUMN))
+        for name, column in zip(header, columns)
+    ]
+    return TupList(SuperDict(zip(header, row)) for row in zip(*columns))
+
+
+def read_csv_params(path: str, table_schema: dict = None) -> SuperDict:
+    """
+    Reads a csv file with the name of a parameter and its value in each row, without header.
+
+    :param path: path of the csv file
+    :param table_schema: json-schema of the parameters
+    :return: a dict {param1: val1}
+    """
+    properties = (table_schema or dict()).get("properties", dict())
+    params = SuperDict()
+    with open(path, "r", newline="", encoding=CSV_ENCODING) as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            column_schema = properties.get(row[0], UNTYPED_COLUMN)
+            value = row[1] if len(row) > 1 else ""
+            if value == "":
+                value = get_empty_value(column_schema)
+            params[row[0]] = get_coercer(column_schema)(value)
+    return params
+
+
+def read_csv_file(path: str, is_param: bool, table_schema: dict = None):
+    """
+    :param path: path of the csv file
+    :param is_param: True if it is a parameter table
+    :param table_schema: json-schema of the table
+    :return: the content of the table
+    """
+    if is_param:
+        return read_csv_params(path, table_schema)
+    return read_csv_table(path, (table_schema or dict()).get("items"))
+
+
+def read_csv_dir(
+    path: str,
+    param_tables_names: List[str] = None,
+    schema: dict = None,
+    tables: List[str] = None,
+    max_workers: int = None,
+    processes: bool = False,
+) -> Dict:
+    """
+    Reads a directory with one csv file per table.
+
+    :param path: path of the directory
+    :param param_tables_names: names of the parameter tables
+    :param schema: optional json-schema of the data, to convert the values to the types of the columns
+    :param tables: names of the tables to read. All of them by default.
+    :param max_workers: if given, the files are read in parallel with this number of workers
+    :param processes: if True, the workers are processes instead of threads
+    :return: a dict with a list of dict (records format) for each table
+      and a dict for each parameter table
+    """
+    if param_tables_names is None:
+        param_tables_names = []
+    properties = (schema or dict()).get("properties", dict())
+    names = [
+        filename[: -len(CSV_EXTENSION)]
+        for filename in sorted(os.listdir(path))
+        if filename.endswith(CSV_EXTENSION)
+    ]
+    if tables is not None:
+        names = [name for name in names if name in tables]
+    args = [
+        (
+            os.path.join(path, name + CSV_EXTENSION),
+            name in param_tables_names,
+            properties.get(name),
+        )
+        for name in names
+    ]
+    if max_workers is None or max_workers <= 1 or len(args) <= 1:
+        return {name: read_csv_file(*arg) for name, arg in zip(names, args)}
+
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        futures = [executor.submit(read_csv_file, *arg) for arg in args]
+        return {name: future.result() for name, future in zip(names, futures)}
+
+
+def write_csv_dir(path: str, data: dict, schema: dict = None) -> None:
+    """
+    Writes each table into a csv file in the directory path, row by row.
+    The tables of records are written with a header and the parameter tables
+    with the name of a parameter and its value in each row.
+
+    :param path: path of the directory. It is created if it does not exist.
+    :param data: data in json format
+    :param schema: optional json-schema of the data, to write the columns in its order
+    """
+    os.makedirs(path, exist_ok=True)
+    properties = (schema or dict()).get("properties", dict())
+    for name, content in data.items():
+        file_path = os.path.join(path, name + CSV_EXTENSION)
+        if isinstance(content, dict):
+            with open(file_path, "w", newline="", encoding=CSV_ENCODING) as f:
+                csv.writer(f).writerows(content.items())
+        elif isinstance(content, list) and all(isinstance(r, dict) for r in content):
+            items = properties.get(name, dict()).get("items", dict())
+            columns = get_column_names(content, items.get("properties", dict()))
+            with open(file_path, "w", newline="", encoding=CSV_ENCODING) as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for record in content:
+                    writer.writerow([record.get(column) for column in columns])
+        else:
+            warnings.warn(f"The table {name} cannot be written into a csv file")
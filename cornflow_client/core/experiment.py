@@ -3,10 +3,12 @@
 """
 # Partial imports
 from abc import ABC, abstractmethod
-from typing import Union, Dict
+from typing import Callable, Union, Dict
 
 # Imports from internal modules
+from .cancellation import stop_requested
 from .instance import InstanceCore
+from .log_buffer import LogBuffer
 from .solution import SolutionCore
 
 
@@ -15,6 +17,14 @@ class ExperimentCore(ABC):
     The solver template.
     """
 
+    # version of the solver: results cached with another version are not used.
+    # It must be changed with each release that can change the results.
+    # The results of the solvers without a version are never cached
+    version = None
+    # solvers whose result depends on more than the data and the configuration set it to False,
+    # so their results are never cached
+    deterministic = True
+
     def __init__(
         self,
         instance: InstanceCore,
@@ -42,6 +52,68 @@ class ExperimentCore(ABC):
     def solution(self, value: SolutionCore) -> None:
         self._solution = value
 
+    @property
+    def log_stream(self) -> LogBuffer:
+        """
+        Bounded stream where the solver can write its log (e.g. with print(..., file=self.log_stream)
+        or with a logging.StreamHandler). Only the last characters are kept in memory.
+
+        :return: the stream of the log
+        """
+        if "_log_stream" not in self.__dict__:
+            self._log_stream = LogBuffer()
+        return self._log_stream
+
+    @log_stream.setter
+    def log_stream(self, value: LogBuffer) -> None:
+        self._log_stream = value
+
+    @property
+    def log(self) -> str:
+        """
+        :return: the log of the solver, as kept by the log stream
+        """
+        return self.log_stream.getvalue()
+
+    @log.setter
+    def log(self, value: str) -> None:
+        self.log_stream.clear()
+        self.log_stream.write(value)
+
+    def should_stop(self) -> bool:
+        """
+        Cheap check that solvers can call periodically (e.g. in each iteration or in a solver callback).
+        When it returns True, the solver should stop and keep its best solution.
+
+        :return: True if the execution has been asked to stop
+        """
+        return stop_requested()
+
+    def add_incumbent_callback(
+        self, callback: Callable[[SolutionCore, Union[float, None]], None]
+    ) -> None:
+        """
+        :param callback: function called with the solution and its objective value
+          each time the solver reports an improved solution with :py:meth:`report_incumbent`
+        """
+        # created here so subclasses that do not call __init__ can use it
+        self.__dict__.setdefault("_incumbent_callbacks", []).append(callback)
+
+    def report_incumbent(self) -> None:
+        """
+        Solvers can call this method each time they store an improved solution in self.solution.
+        The callbacks run in the thread of the solver so they should return quickly.
+        """
+        callbacks = self.__dict__.get("_incumbent_callbacks")
+        if not callbacks or self.solution is None:
+            return
+        try:
+            objective = self.get_objective()
+        except Exception:
+            objective = None
+        for callback in callbacks:
+            callback(self.solution, objective)
+
     @abstractmethod
     def solve(self, options: dict) -> dict:
         """
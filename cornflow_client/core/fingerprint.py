@@ -0,0 +1,282 @@
+"""
+Canonical fingerprints of the data of instances and solutions.
+
+The data is walked once and encoded into the hash in chunks, without building
+a json string of the whole data. The encoding is canonical:
+
+- the keys of the dictionaries are sorted,
+- the numbers are compared by value (1 and 1.0 have the same fingerprint),
+- the tables of records are encoded by columns, so the order of the keys of the records,
+  and the storage of the table (records or :py:class:`ColumnarTable`), do not change it.
+"""
+# Full imports
+import hashlib
+import math
+
+# Partial imports
+from numbers import Integral, Real
+from operator import itemgetter
+from typing import Dict, List, Union
+
+# Imports from internal modules
+from .columnar import ColumnarTable
+
+# number of encoded parts kept before they are added to the hash
+FLUSH_SIZE = 4096
+DIGEST_SIZE = 32
+# tables with up to this number of records are not split into columns to be encoded
+SMALL_TABLE_SIZE = 16
+# value of a column in the records that do not have it
+_MISSING = object()
+
+
+def get_hasher():
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def get_number_token(value) -> str:
+    """
+    :param value: an int or a float
+    :return: its encoding. The floats with an integer value are encoded as integers.
+    """
+    if type(value) is int:
+        return f"i{value};"
+    if math.isfinite(value) and value.is_integer():
+        return f"i{int(value)};"
+    return f"d{value!r};"
+
+
+def get_scalar_token(value) -> Union[str, None]:
+    """
+    :param value: a json value
+    :return: its encoding if it is a string, a number, a boolean or a null. None otherwise.
+    """
+    kind = type(value)
+    if kind is str:
+        return f"s{len(value)}:{value}"
+    if kind is int or kind is float:
+        return get_number_token(value)
+    if value is None:
+        return "n;"
+    if kind is bool:
+        return "t;" if value else "f;"
+    if value is _MISSING:
+        return "m;"
+    return None
+
+
+def get_key(key) -> str:
+    """
+    :param key: a key of a dictionary
+    :return: the key as in json format
+    """
+    return key if type(key) is str else str(key)
+
+
+class Encoder:
+    """
+    Encodes json values into a hash
+    """
+
+    def __init__(self, hasher=None):
+        """
+        :param hasher: a hashlib object. blake2b by default.
+        """
+        self.hasher = hasher or get_hasher()
+        self.parts = []
+
+    def add(self, part: str) -> None:
+        self.parts.append(part)
+
+    def flush(self) -> None:
+        if self.parts:
+            self.hasher.update("".join(self.parts).encode("utf-8", "surrogatepass"))
+            self.parts.clear()
+
+    def check_flush(self) -> None:
+        if len(self.parts) >= FLUSH_SIZE:
+            self.flush()
+
+    def hexdigest(self) -> str:
+        self.flush()
+        return self.hasher.hexdigest()
+
+    def encode(self, value) -> None:
+        """
+        :param value: a json value. Numpy values and arrays are encoded as python values,
+          other objects as their string representation.
+        """
+        token = get_scalar_token(value)
+        if token is not None:
+            self.parts.append(token)
+        elif isinstance(value, dict):
+            self.encode_dict(value)
+        elif isinstance(value, ColumnarTable):
+            self.encode_columnar(value)
+        elif isinstance(value, (list, tuple)):
+            if value and all(isinstance(row, dict) for row in value):
+                self.encode_records(value)
+            else:
+                self.encode_list(value)
+        elif isinstance(value, Integral):
+            self.parts.append(get_number_token(int(value)))
+        elif isinstance(value, Real):
+            self.parts.append(get_number_token(float(value)))
+        elif hasattr(value, "tolist"):
+            # numpy arrays
+            self.encode(value.tolist())
+        else:
+            self.encode(str(value))
+
+    def encode_list(self, values: List) -> None:
+        parts = self.parts
+        parts.append("[")
+        for value in values:
+            token = get_scalar_token(value)
+            if token is None:
+                self.encode(value)
+                self.check_flush()
+            else:
+                parts.append(token)
+        parts.append("]")
+        self.check_flush()
+
+    def encode_dict(self, value: dict) -> None:
+        # dict.items does not convert the values of a LazySuperDict
+        items = [(get_key(key), content) for key, content in dict.items(value)]
+        items.sort(key=itemgetter(0))
+        parts = self.parts
+        parts.append("{")
+        for key, content in items:
+            parts.append(f"s{len(key)}:{key}")
+            token = get_scalar_token(content)
+            if token is None:
+                self.encode(content)
+                self.check_flush()
+            else:
+                parts.append(token)
+        parts.append("}")
+        self.check_flush()
+
+    def encode_column(self, values: List) -> None:
+        """
+        :param values: the values of a column. _MISSING in the records without the column.
+        """
+        kinds = set(map(type, values))
+        if kinds == {int}:
+            self.parts.append("i" + ";i".join(map(str, values)) + ";")
+        elif kinds == {str}:
+            self.parts.append("".join([f"s{len(value)}:{value}" for value in values]))
+        elif kinds == {float} or kinds == {int, float}:
+            self.parts.append("".join(map(get_number_token, values)))
+        elif kinds == {type(None)}:
+            self.parts.append("n;" * len(values))
+        else:
+            for value in values:
+                token = get_scalar_token(value)
+                if token is None:
+                    self.encode(value)
+                else:
+                    self.parts.append(token)
+
+    def encode_records(self, records: List[dict]) -> None:
+        names = set()
+        for record in records:
+            names.update(record)
+        columns = sorted((get_key(name), name) for name in names)
+        parts = self.parts
+        # the number of columns and the closing token delimit the table
+        parts.append(f"T{len(records)},{len(columns)};")
+        if len(records) > SMALL_TABLE_SIZE:
+            for key, name in columns:
+                parts.append(f"s{len(key)}:{key}")
+                self.encode_column([record.get(name, _MISSING) for record in records])
+                self.check_flush()
+            parts.append("]")
+            return
+        # the same encoding, without the cost of building the columns
+        for key, name in columns:
+            parts.append(f"s{len(key)}:{key}")
+            for record in records:
+                value = record.get(name, _MISSING)
+                token = get_scalar_token(value)
+                if token is None:
+                    self.encode(value)
+                else:
+                    parts.append(token)
+        parts.append("]")
+        self.check_flush()
+
+    def encode_columnar(self, table: ColumnarTable) -> None:
+        if not len(table):
+            self.parts.append("[]")
+            return
+        columns = []
+        for name, column in table.columns.items():
+            missing = table.missing.get(name)
+            if missing is not None and missing.all():
+                # the records do not have the column
+                continue
+            columns.append((get_key(name), column, missing))
+        columns.sort(key=itemgetter(0))
+        self.parts.append(f"T{len(table)},{len(columns)};")
+        for key, column, missing in columns:
+            self.parts.append(f"s{len(key)}:{key}")
+            values = column.tolist()
+            if missing is not None:
+                values = [
+                    _MISSING if absent else value
+                    for value, absent in zip(values, missing.tolist())
+                ]
+            self.encode_column(values)
+            self.check_flush()
+        self.parts.append("]")
+
+
+def get_value_fingerprint(value) -> str:
+    """
+    :param value: a json value
+    :return: the fingerprint of the value
+    """
+    encoder = Encoder()
+    encoder.encode(value)
+    return encoder.hexdigest()
+
+
+def get_table_fingerprints(data: dict) -> Dict[str, str]:
+    """
+    :param data: data of an instance or a solution
+    :return: the fingerprint of each table of the data
+    """
+    return {
+        get_key(name): get_value_fingerprint(content)
+        for name, content in dict.items(data)
+    }
+
+
+def combine_fingerprints(fingerprints: Dict[str, str]) -> str:
+    """
+    :param fingerprints: the fingerprint of each table of the data
+    :return: the fingerprint of the data
+    """
+    encoder = Encoder()
+    encoder.add("{")
+    for name, fingerprint in sorted(fingerprints.items()):
+        encoder.add(f"s{len(name)}:{name}h{fingerprint};")
+    encoder.add("}")
+    return encoder.hexdigest()
+
+
+def get_fingerprint(data) -> str:
+    """
+    Fingerprint of the data. It does not depend on the order of the keys, on the storage
+    of the tables or on the type of the numbers (1 and 1.0 are the same).
+
+    :param data: data of an instance or a solution, or any json value
+    :return: the fingerprint, a hexadecimal string.
+      For a dictionary, it is computed from the fingerprints of its tables
+      (see :py:func:`get_table_fingerprints`).
+    """
+    if isinstance(data, dict):
+        return combine_fingerprints(get_table_fingerprints(data))
+    return get_value_fingerprint(data)
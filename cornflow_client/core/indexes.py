@@ -0,0 +1,62 @@
+"""
+Lookup indexes over the tables of instances and solutions
+"""
+# Partial imports
+from pytups import SuperDict, TupList
+from typing import Tuple, Union
+
+
+class Index:
+    """
+    Declaration of a hash index over a table of records.
+
+    A unique index maps each key to its record. A non-unique index (group by)
+    maps each key to the list of records with that key.
+    Composite keys are given as a tuple of columns and the keys of the index are tuples.
+    """
+
+    def __init__(
+        self, table: str, key: Union[str, Tuple[str, ...]], unique: bool = True
+    ):
+        """
+        :param table: name of the table
+        :param key: name of the column, or tuple of names of the columns, of the key
+        :param unique: True if there is at most one record per key
+        """
+        self.table = table
+        self.key = key
+        self.unique = unique
+
+    def get_key(self, record: dict):
+        """
+        :param record: a record of the table
+        :return: the key of the record in the index
+        """
+        if isinstance(self.key, tuple):
+            return tuple(record[column] for column in self.key)
+        return record[self.key]
+
+    def build(self, data: dict) -> SuperDict:
+        """
+        :param data: the data with the table
+        :return: a dictionary with the records of each key
+        """
+        index = SuperDict()
+        if self.unique:
+            for record in data[self.table]:
+                key = self.get_key(record)
+                if key in index:
+                    raise ValueError(
+                        f"The key {key} is repeated in the table {self.table}"
+                    )
+                index[key] = record
+            return index
+        for record in data[self.table]:
+            key = self.get_key(record)
+            if key not in index:
+                index[key] = TupList()
+            index[key].append(record)
+        return index
+
+    def __repr__(self) -> str:
+        return f"Index(table={self.table!r}, key={self.key!r}, unique={self.unique})"
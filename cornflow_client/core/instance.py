@@ -1,10 +1,20 @@
 """
 
 """
+# Full imports
+import os
+
 # Partial imports
 from abc import ABC
+from typing import Union
 
 # Imports from internal modules
+from .compiled import (
+    evict_artifacts,
+    get_artifact_path,
+    read_artifact,
+    write_artifact,
+)
 from .instance_solution import InstanceSolutionCore
 
 
@@ -13,6 +23,10 @@ class InstanceCore(InstanceSolutionCore, ABC):
     The instance template.
     """
 
+    # the instances compiled with another compiled_version (or another schema) are not loaded:
+    # it must be changed when the attributes stored in a compiled instance change
+    compiled_version = None
+
     # TODO: make abstractmethod
     def check_inconsistencies(self, *args, **kwargs) -> dict:
         """
@@ -43,3 +57,42 @@ class InstanceCore(InstanceSolutionCore, ABC):
         if not is_feasible:
             inconsistencies["is_infeasible"] = True
         return inconsistencies
+
+    def compile(
+        self, directory: str, content_hash: str = None, max_size: int = None
+    ) -> str:
+        """
+        Precomputes the instance (see :py:meth:`precompute`) and stores it in a binary file,
+        so other executions with the same data can load it with :py:meth:`from_compiled`
+        instead of building it again.
+
+        :param directory: directory of the compiled instances. It is created if it does not exist.
+        :param content_hash: fingerprint of the data of the instance (see :py:meth:`fingerprint`).
+          It is computed if not given.
+        :param max_size: maximum size of the directory in bytes. The least recently used
+          compiled instances are removed when it is exceeded. Not bounded if not given.
+        :return: the path of the compiled instance, without extension
+        """
+        if content_hash is None:
+            content_hash = self.fingerprint()
+        self.precompute()
+        os.makedirs(directory, exist_ok=True)
+        path = get_artifact_path(directory, type(self), content_hash)
+        write_artifact(self, path)
+        if max_size is not None:
+            evict_artifacts(directory, max_size)
+        return path
+
+    @classmethod
+    def from_compiled(
+        cls, directory: str, content_hash: str
+    ) -> Union["InstanceCore", None]:
+        """
+        :param directory: directory of the compiled instances
+        :param content_hash: fingerprint of the data of the instance (see :py:func:`get_fingerprint`)
+        :return: the compiled instance, None if there is none for that data
+        """
+        instance = read_artifact(get_artifact_path(directory, cls, content_hash))
+        if not isinstance(instance, cls):
+            return None
+        return instance
@@ -3,17 +3,32 @@
 """
 # Full imports
 import json
-import warnings
 
 # Partial imports
 from abc import ABC, abstractmethod
 from genson import SchemaBuilder
-from jsonschema import Draft7Validator
 from pytups import SuperDict
-from typing import List
+from timeit import default_timer as timer
+from typing import Dict, List
 
 # Imports from internal modules
-from .read_tools import read_excel, is_xl_type
+from .arrow_tools import read_parquet, write_parquet
+from .columnar import from_columnar, to_columnar
+from .copy_on_write import CowDict
+from .csv_tools import read_csv_dir, write_csv_dir
+from .fingerprint import combine_fingerprints, get_table_fingerprints
+from .indexes import Index
+from .memoize import get_memo_caches
+from .lazy import LazySuperDict
+from .read_tools import read_excel
+from .tools import get_validator
+from .write_tools import write_excel
+from cornflow_client.schema.inference import infer_schema
+from cornflow_client.constants import (
+    STORAGE_COLUMNAR,
+    STORAGE_DICT,
+    STORAGE_LAZY,
+)
 
 
 class InstanceSolutionCore(ABC):
@@ -22,7 +37,15 @@ class InstanceSolutionCore(ABC):
     """
 
     def __init__(self, data: dict):
-        self.data = SuperDict.from_dict(data)
+        start = timer()
+        if self.storage == STORAGE_COLUMNAR:
+            self.data = to_columnar(data, self.schema)
+        elif self.storage == STORAGE_LAZY:
+            self.data = LazySuperDict.wrap(data)
+        else:
+            self.data = SuperDict.from_dict(data)
+        # kept to profile the cost of the conversion
+        self._conversion_time = timer() - start
 
     @property
     def data(self) -> dict:
@@ -34,6 +57,124 @@ class InstanceSolutionCore(ABC):
     @data.setter
     def data(self, value: dict):
         self._data = value
+        # the indexes and the memoized results are computed again from the new data
+        self._index_cache = dict()
+        self._data_version = self.__dict__.get("_data_version", 0) + 1
+
+    @property
+    def data_version(self) -> int:
+        """
+        :return: a counter that increases each time the data is assigned
+        """
+        return self.__dict__.get("_data_version", 0)
+
+    @property
+    def precomputations(self) -> List[str]:
+        """
+        Optional property
+
+        :return: names of methods without arguments or properties that are computed
+          by :py:meth:`precompute`, usually memoized (see :py:func:`memoize`)
+        """
+        return []
+
+    def precompute(self) -> None:
+        """
+        Builds all the indexes and computes the precomputations,
+        so they are stored with the object (e.g. in a compiled instance).
+        """
+        for name in self.indexes:
+            self.get_index(name)
+        for name in self.precomputations:
+            value = getattr(self, name)
+            if callable(value):
+                value()
+
+    def clone(self) -> "InstanceSolutionCore":
+        """
+        Copies the object without copying its data: the clone shares the data of the object
+        (copy-on-write). A table or a record is copied the first time it is reached
+        through the clone, so the parts of the data that are never reached are never copied
+        (see :py:class:`CowDict`). The changes made through the clone do not change the object.
+
+        The object is not changed: it keeps its data, its indexes and its memoized results.
+        Its data must not be modified while a clone shares it: to keep modifying it,
+        modify a clone instead. The indexes and the memoized results of the clone
+        are computed again. The rest of the attributes are shared, as in a shallow copy.
+
+        :return: the clone
+        """
+        data = self.data
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__.pop("_memo_caches", None)
+        if isinstance(data, CowDict):
+            # the values the object owned are shared with the clone now
+            clone.data = data.copy()
+        else:
+            clone.data = CowDict.share(data)
+        return clone
+
+    def fingerprint(self) -> str:
+        """
+        A hash of the data that does not depend on the order of the keys,
+        on the storage of the data or on the type of the numbers (1 and 1.0 are the same).
+        It is computed again each time, so it sees the changes made inside the data.
+
+        :return: the fingerprint of the data, a hexadecimal string
+        """
+        return combine_fingerprints(self.table_fingerprints())
+
+    def table_fingerprints(self) -> Dict[str, str]:
+        """
+        :return: the fingerprint of each table of the data,
+          to find the tables that changed between two versions of the data
+        """
+        return get_table_fingerprints(self.data)
+
+    def get_memo_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        :return: the hits, misses, size, evictions and invalidations
+          of each memoized method of this object (see :py:func:`memoize`)
+        """
+        return {name: cache.stats() for name, cache in get_memo_caches(self).items()}
+
+    @property
+    def indexes(self) -> Dict[str, Index]:
+        """
+        Optional property
+
+        :return: a dictionary with the indexes over the tables of the data, by name.
+          They are built the first time they are used (see :py:meth:`get_index`).
+        """
+        return dict()
+
+    def get_index(self, name: str) -> SuperDict:
+        """
+        The index is built once and kept until the data is assigned again.
+        Changes made inside the data (e.g. adding a record to a table) are not seen by the index.
+
+        :param name: name of an index declared in indexes
+        :return: the index: a dictionary with the record (unique index)
+          or the list of records (non-unique index) of each key
+        """
+        cache = self.__dict__.setdefault("_index_cache", dict())
+        if name not in cache:
+            cache[name] = self.indexes[name].build(self.data)
+        return cache[name]
+
+    @property
+    def storage(self) -> str:
+        """
+        Optional property
+
+        :return: how the data is stored: STORAGE_DICT (default), STORAGE_COLUMNAR or STORAGE_LAZY.
+          With STORAGE_COLUMNAR, the tables of records in the schema are stored
+          as one array per column (see :py:class:`ColumnarTable`).
+          With STORAGE_LAZY, the nested dictionaries are only converted when they are accessed
+          (see :py:class:`LazySuperDict`).
+        """
+        return STORAGE_DICT
 
     @classmethod
     def from_dict(cls, data: dict) -> "InstanceSolutionCore":
@@ -48,6 +189,8 @@ class InstanceSolutionCore(ABC):
         """
         :return: a dictionary with the json-schema representation
         """
+        if self.storage == STORAGE_COLUMNAR:
+            return from_columnar(self.data)
         return self.data
 
     @classmethod
@@ -72,6 +215,30 @@ class InstanceSolutionCore(ABC):
         with open(path, "w") as f:
             json.dump(data, f, indent=4, sort_keys=True)
 
+    @classmethod
+    def from_parquet(
+        cls, path: str, tables: List = None, memory_map: bool = True
+    ) -> "InstanceSolutionCore":
+        """
+        :param path: path of a directory written by :py:meth:`to_parquet`
+        :param tables: names of the tables to read. All of them by default.
+        :param memory_map: if True, the files are memory-mapped instead of read into memory
+        :return: an object initialized from the tables in the directory
+        """
+        # with the columnar storage, the tables are not converted into records
+        columnar = cls(dict()).storage == STORAGE_COLUMNAR
+        data = read_parquet(path, tables, memory_map=memory_map, columnar=columnar)
+        return cls.from_dict(data)
+
+    def to_parquet(self, path: str) -> None:
+        """
+        :param path: path of a directory
+
+        writes each table of records of the json-schema representation into a parquet file,
+        with the types of the columns taken from the schema
+        """
+        write_parquet(self.to_dict(), path, self.schema)
+
     @property
     @abstractmethod
     def schema(self) -> dict:
@@ -88,16 +255,20 @@ class InstanceSolutionCore(ABC):
         :return: a list of errors
         """
 
-        validator = Draft7Validator(self.schema)
+        validator = get_validator(self.schema)
         data = self.to_dict()
         if not validator.is_valid(data):
             return [e for e in validator.iter_errors(data)]
         return []
 
-    def generate_schema(self) -> dict:
+    def generate_schema(self, sample_size: int = None) -> dict:
         """
+        :param sample_size: if given, the schema is inferred from a sample of this number of rows
+          of each table (see :py:func:`infer_schema`) instead of from all the data
         :return: a dict json-schema based on the current data
         """
+        if sample_size is not None:
+            return infer_schema(self.to_dict(), sample_size)[0]
         builder = SchemaBuilder()
         builder.add_schema({"type": "object", "properties": {}})
         builder.add_object(self.to_dict())
@@ -114,9 +285,46 @@ class InstanceSolutionCore(ABC):
 
         param_tables_names = cls.__get_parameter_tables_names()
 
-        tables = read_excel(path, param_tables_names)
+        tables = read_excel(path, param_tables_names, cls(dict()).schema)
         return cls.from_dict(tables)
 
+    @classmethod
+    def from_csv_dir(
+        cls,
+        path: str,
+        tables: List = None,
+        max_workers: int = None,
+        processes: bool = False,
+    ) -> "InstanceSolutionCore":
+        """
+        Read a directory with one csv file per table.
+        The parameter tables have the name of a parameter and its value in each row.
+
+        :param path: path of the directory
+        :param tables: names of the tables to read. All of them by default.
+        :param max_workers: if given, the files are read in parallel with this number of workers
+        :param processes: if True, the workers are processes instead of threads
+        :return: an object initialized from the tables in the directory
+        """
+        param_tables_names = cls.__get_parameter_tables_names()
+        tables = read_csv_dir(
+            path,
+            param_tables_names,
+            cls(dict()).schema,
+            tables=tables,
+            max_workers=max_workers,
+            processes=processes,
+        )
+        return cls.from_dict(tables)
+
+    def to_csv_dir(self, path: str) -> None:
+        """
+        :param path: path of a directory
+
+        writes each table of the json-schema representation into a csv file
+        """
+        write_csv_dir(path, self.to_dict(), self.schema)
+
     @classmethod
     def __get_parameter_tables_names(cls) -> List:
         """
@@ -134,28 +342,9 @@ class InstanceSolutionCore(ABC):
     def to_excel(self, path: str):
         """
         Write data to excel.
+        The rows are streamed into the file, with the columns in the order of the schema.
 
         :param path: path or name of the excel file
         :return: nothing
         """
-        try:
-            import pandas as pd
-        except (ImportError, ModuleNotFoundError):
-            warnings.warn("You have to install pandas to use this method")
-            raise Exception("You must install pandas package to use this method")
-
-        is_xl_type(path)
-
-        data = self.to_dict()
-
-        with pd.ExcelWriter(path) as writer:
-            for table in data.keys():
-                content = data[table]
-                if isinstance(content, list):
-                    pd.DataFrame.from_records(content).to_excel(
-                        writer, table, index=False
-                    )
-                elif isinstance(content, dict):
-                    pd.DataFrame.from_dict(content, orient="index").to_excel(
-                        writer, table, header=False
-                    )
+        write_excel(path, self.to_dict(), self.schema)
@@ -0,0 +1,296 @@
+"""
+Run a solver in a child process, isolated from the process that launched it
+"""
+# Full imports
+import multiprocessing
+import os
+import pickle
+import tempfile
+import traceback
+
+# Partial imports
+from timeit import default_timer as timer
+from typing import Dict, Type, Union
+
+# Imports from internal modules
+from .cancellation import install_signal_handler, stop_requested
+from .experiment import ExperimentCore
+from .instance import InstanceCore
+from .limits import DEFAULT_GRACE, get_time_limits, memory_limit, time_limit
+from .solution import SolutionCore
+from cornflow_client.constants import (
+    STATUS_FEASIBLE,
+    STATUS_NOT_SOLVED,
+    STATUS_TIME_LIMIT,
+    STATUS_MEMORY_LIMIT,
+    MemoryLimitExceeded,
+    TimeLimitExceeded,
+)
+
+# seconds between two checks of a stop request while waiting for a process
+STOP_POLL_INTERVAL = 0.5
+# minimum seconds between two incumbents written by a child process
+INCUMBENT_WRITE_INTERVAL = 1
+
+
+def get_result(algo: ExperimentCore, output: Union[dict, int, None]) -> Dict:
+    """
+    :param algo: a solver after running
+    :param output: the output of the solve method
+    :return: a picklable summary of the run with the output, the solution, the objective and the log
+    """
+    if isinstance(output, int):
+        output = dict(status=output)
+    solution = None
+    objective = None
+    if algo.solution is not None and len(algo.solution.data):
+        solution = algo.solution.to_dict()
+        try:
+            objective = algo.get_objective()
+        except Exception:
+            objective = None
+    try:
+        log = algo.log
+    except Exception:
+        log = ""
+    return dict(output=output, solution=solution, objective=objective, log=log)
+
+
+def write_result(path: str, result: Dict) -> None:
+    """
+    Writes the result into a file. The file is replaced atomically
+    so a reader never finds a partially written result.
+
+    :param path: path of the file
+    :param result: the result to write
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_result(path: str) -> Union[Dict, None]:
+    """
+    :param path: path of the file
+    :return: the result stored in the file, None if there is none
+    """
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+def solve_in_child(
+    solver_class: Type[ExperimentCore],
+    instance: InstanceCore,
+    solution: Union[SolutionCore, None],
+    config: dict,
+    path: str,
+    seconds: Union[float, None],
+) -> None:
+    """
+    Target of the child process: solves and writes the result into path.
+    When the process is terminated, the solver is asked to stop (see :py:meth:`ExperimentCore.should_stop`)
+    and its solution is written before the process is killed.
+    """
+    install_signal_handler()
+    algo = solver_class(instance, solution)
+    last_write = dict(time=None)
+
+    def write_incumbent(_solution, _objective):
+        # the incumbent is recovered if the process has to be killed
+        now = timer()
+        if last_write["time"] and now - last_write["time"] < INCUMBENT_WRITE_INTERVAL:
+            return
+        last_write["time"] = now
+        write_result(path, dict(get_result(algo, None), incumbent=True))
+
+    algo.add_incumbent_callback(write_incumbent)
+    try:
+        with time_limit(seconds), memory_limit(config.get("maxMemory")):
+            output = algo.solve(config)
+    except TimeLimitExceeded:
+        output = dict(status=STATUS_TIME_LIMIT)
+    except MemoryLimitExceeded:
+        output = dict(status=STATUS_MEMORY_LIMIT)
+    except Exception:
+        output = dict(status=STATUS_NOT_SOLVED, error=traceback.format_exc())
+    write_result(path, get_result(algo, output))
+
+
+class IsolatedRun:
+    """
+    A solver running in a child process with a wall-clock watchdog.
+    The result is written by the child into a temporary file instead of being sent through a pipe.
+
+    The watchdog uses the configuration keys:
+
+    * **timeLimit**: time limit of the solver, in seconds.
+    * **timeLimitGrace**: seconds the solver is allowed to go over the time limit.
+      After them, the child process stops the solver and keeps the solution it had stored.
+      If the child process does not stop after the same amount of seconds, it is terminated.
+      It is also the time a terminated process has to write its solution before being killed.
+    """
+
+    def __init__(
+        self,
+        solver_class: Type[ExperimentCore],
+        instance: InstanceCore,
+        solution: Union[SolutionCore, None],
+        config: dict,
+        context=None,
+    ):
+        """
+        :param solver_class: the solver constructor
+        :param instance: the instance to solve
+        :param solution: the initial solution, if any
+        :param config: execution configuration
+        :param context: optional multiprocessing context. The default context is used if not given.
+        """
+        if context is None:
+            context = multiprocessing.get_context()
+        soft_limit, self.hard_limit = get_time_limits(config)
+        self.grace = config.get("timeLimitGrace", DEFAULT_GRACE)
+        fd, self.path = tempfile.mkstemp(prefix="cornflow_", suffix=".pkl")
+        os.close(fd)
+        os.remove(self.path)
+        self.process = context.Process(
+            target=solve_in_child,
+            args=(solver_class, instance, solution, config, self.path, soft_limit),
+            daemon=True,
+        )
+        self.start_time = None
+        self.timed_out = False
+        self.cancelled = False
+
+    def start(self) -> "IsolatedRun":
+        self.start_time = timer()
+        self.process.start()
+        return self
+
+    @property
+    def sentinel(self):
+        """
+        :return: an object that becomes ready when the process ends
+          (see :py:func:`multiprocessing.connection.wait`)
+        """
+        return self.process.sentinel
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def remaining_time(self) -> Union[float, None]:
+        """
+        :return: seconds left until the hard limit, None if there is no limit
+        """
+        if self.hard_limit is None:
+            return None
+        return max(self.hard_limit - (timer() - self.start_time), 0)
+
+    def wait(self) -> "IsolatedRun":
+        """
+        Waits until the process finishes, the hard limit is reached or a stop is requested
+        """
+        while self.process.is_alive():
+            if stop_requested():
+                return self.stop()
+            remaining = self.remaining_time()
+            if remaining == 0:
+                self.timed_out = True
+                stop_process(self.process, self.grace)
+                return self
+            self.process.join(min_timeout(remaining, STOP_POLL_INTERVAL))
+        return self
+
+    def stop(self) -> "IsolatedRun":
+        """
+        Stops the process, even if the limit has not been reached
+        """
+        if self.process.is_alive():
+            self.cancelled = True
+            stop_process(self.process, self.grace)
+        return self
+
+    def collect(self) -> Dict:
+        """
+        Reads the result written by the process and removes the temporary files.
+        The process must have finished.
+
+        :return: a dictionary with the output of the solve method, the solution (json format),
+          its objective value, the log of the solver and its running time
+        """
+        try:
+            result = read_result(self.path)
+        finally:
+            for _path in [self.path, self.path + ".tmp"]:
+                if os.path.exists(_path):
+                    os.remove(_path)
+        if result is None:
+            result = dict()
+        # an incumbent means that the process did not finish: we only have its last solution
+        output = None if result.pop("incumbent", False) else result.get("output")
+        if output is None and self.timed_out:
+            output = dict(status=STATUS_TIME_LIMIT)
+        elif output is None and self.cancelled:
+            status = STATUS_FEASIBLE if result.get("solution") else STATUS_NOT_SOLVED
+            output = dict(status=status)
+        elif output is None:
+            error = f"The solver process finished unexpectedly with code {self.process.exitcode}"
+            output = dict(status=STATUS_NOT_SOLVED, error=error)
+        result["output"] = output
+        result.setdefault("solution", None)
+        result.setdefault("objective", None)
+        result.setdefault("log", "")
+        result["time"] = timer() - self.start_time
+        return result
+
+
+def run_isolated(
+    solver_class: Type[ExperimentCore],
+    instance: InstanceCore,
+    solution: Union[SolutionCore, None],
+    config: dict,
+    context=None,
+) -> Dict:
+    """
+    Runs the solver in a child process and waits for it (see :py:class:`IsolatedRun`).
+
+    :param solver_class: the solver constructor
+    :param instance: the instance to solve
+    :param solution: the initial solution, if any
+    :param config: execution configuration
+    :param context: optional multiprocessing context. The default context is used if not given.
+    :return: the result of the run (see :py:meth:`IsolatedRun.collect`)
+    """
+    run = IsolatedRun(solver_class, instance, solution, config, context=context)
+    try:
+        run.start().wait()
+    finally:
+        run.stop()
+    return run.collect()
+
+
+def min_timeout(*timeouts: Union[float, None]) -> Union[float, None]:
+    """
+    :return: the smallest timeout, ignoring the None values (no timeout)
+    """
+    values = [t for t in timeouts if t is not None]
+    if not values:
+        return None
+    return min(values)
+
+
+def stop_process(process, timeout: float = DEFAULT_GRACE) -> None:
+    """
+    Terminates a process and kills it if it does not finish in time.
+
+    :param process: the process to stop
+    :param timeout: seconds to wait after terminating it
+    """
+    process.terminate()
+    process.join(timeout)
+    if process.is_alive():
+        process.kill()
+        process.join()
@@ -0,0 +1,66 @@
+"""
+Lazy wrapping of the data of instances and solutions
+"""
+# Partial imports
+from pytups import SuperDict
+
+
+class LazySuperDict(SuperDict):
+    """
+    A SuperDict that wraps a (possibly nested) dictionary without converting it.
+    The nested dictionaries are converted into LazySuperDict the first time they are accessed,
+    so the parts of the data that are never accessed are never copied.
+
+    The result is the same as :py:meth:`SuperDict.from_dict`: only the nested dictionaries
+    are converted, lists are kept as they are.
+    """
+
+    @classmethod
+    def wrap(cls, data):
+        """
+        :param data: any value
+        :return: the value, wrapped if it is a dictionary
+        """
+        if isinstance(data, dict) and not isinstance(data, SuperDict):
+            return cls(data)
+        return data
+
+    def _convert(self, key, value):
+        wrapped = self.wrap(value)
+        if wrapped is not value:
+            dict.__setitem__(self, key, wrapped)
+        return wrapped
+
+    def _convert_all(self) -> None:
+        for key, value in dict.items(self):
+            self._convert(key, value)
+
+    def __getitem__(self, key):
+        return self._convert(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def pop(self, key, *args):
+        return self.wrap(dict.pop(self, key, *args))
+
+    def items(self):
+        self._convert_all()
+        return dict.items(self)
+
+    def values(self):
+        self._convert_all()
+        return dict.values(self)
+
+    @property
+    def converted(self) -> int:
+        """
+        :return: the number of nested dictionaries already converted (all the levels)
+        """
+        return sum(
+            1 + value.converted
+            for value in dict.values(self)
+            if isinstance(value, LazySuperDict)
+        )
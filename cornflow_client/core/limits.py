@@ -0,0 +1,208 @@
+"""
+Watchdogs that enforce resource limits on a running solver
+"""
+# Full imports
+import ctypes
+import os
+import sys
+import threading
+import warnings
+
+# Partial imports
+from timeit import default_timer as timer
+from typing import Tuple, Type, Union
+
+# Imports from internal modules
+from cornflow_client.constants import (
+    LimitExceeded,
+    MemoryLimitExceeded,
+    TimeLimitExceeded,
+)
+
+DEFAULT_GRACE = 5
+
+
+def get_current_rss() -> Union[int, None]:
+    """
+    :return: the current resident set size of the process in bytes.
+      None if it cannot be measured (without psutil, only in linux).
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "r") as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            pass
+    try:
+        import psutil
+    except (ImportError, ModuleNotFoundError):
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def raise_in_thread(thread_id: int, exception: Union[Type[BaseException], None]):
+    """
+    Asynchronously raises an exception in another thread.
+    The exception is raised the next time the thread executes python code,
+    so native code (e.g. inside a solver library) is not interrupted until it returns.
+
+    :param thread_id: identifier of the thread
+    :param exception: the exception class to raise. None clears a pending exception.
+    :return: True if the thread was found
+    """
+    exc = ctypes.py_object(exception) if exception is not None else None
+    modified = ctypes.pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread_id), exc
+    )
+    return modified == 1
+
+
+class LimitWatchdog(threading.Thread):
+    """
+    Background thread that checks a limit periodically and, once it is reached,
+    raises an exception in the watched thread every interval seconds until the watched code exits,
+    so the limit is enforced even if the solver catches the exception.
+    The watched thread is the one that creates the watchdog.
+    It can be used as a context manager around the code to watch.
+    """
+
+    exception = LimitExceeded
+
+    def __init__(self, interval: float = 0.1):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.thread_id = threading.get_ident()
+        self.triggered = False
+        self._stop_event = threading.Event()
+
+    def limit_reached(self) -> bool:
+        """
+        :return: True if the limit has been reached
+        """
+        raise NotImplementedError()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            if self.triggered or self.limit_reached():
+                self.triggered = True
+                raise_in_thread(self.thread_id, self.exception)
+
+    def stop(self) -> None:
+        """
+        Stops the watchdog and discards the exception if it was not raised yet
+        """
+        self._stop_event.set()
+        if self.is_alive():
+            self.join()
+        if self.triggered:
+            raise_in_thread(self.thread_id, None)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        while True:
+            try:
+                self.stop()
+                return False
+            except LimitExceeded:
+                # raised again (by this or another watchdog) while stopping
+                continue
+
+
+class MemoryWatchdog(LimitWatchdog):
+    """
+    Raises :py:class:`MemoryLimitExceeded` when the resident memory
+    of the process goes over max_memory bytes.
+    """
+
+    exception = MemoryLimitExceeded
+
+    def __init__(self, max_memory: int, interval: float = 0.1):
+        super().__init__(interval=interval)
+        self.max_memory = max_memory
+        self.peak_memory = 0
+
+    def limit_reached(self) -> bool:
+        memory = get_current_rss()
+        if memory is None:
+            return False
+        self.peak_memory = max(self.peak_memory, memory)
+        return memory > self.max_memory
+
+
+class TimeWatchdog(LimitWatchdog):
+    """
+    Raises :py:class:`TimeLimitExceeded` when more than time_limit seconds
+    have passed since its creation.
+    """
+
+    exception = TimeLimitExceeded
+
+    def __init__(self, time_limit: float, interval: float = 0.1):
+        super().__init__(interval=interval)
+        self.deadline = timer() + time_limit
+
+    def limit_reached(self) -> bool:
+        return timer() > self.deadline
+
+
+class NoLimit:
+    """
+    Placeholder for the watchdogs when there is no limit to enforce
+    """
+
+    triggered = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+def memory_limit(max_memory: Union[int, None], interval: float = 0.1):
+    """
+    :param max_memory: maximum resident memory of the process, in megabytes.
+      None means there is no limit.
+      The limit is not enforced if the current memory of the process cannot be measured.
+    :param interval: seconds between checks
+    :return: a context manager that enforces the limit
+    """
+    if max_memory is None:
+        return NoLimit()
+    if get_current_rss() is None:
+        warnings.warn("You must install psutil package to enforce the memory limit")
+        return NoLimit()
+    return MemoryWatchdog(max_memory * 1024 * 1024, interval=interval)
+
+
+def time_limit(seconds: Union[float, None], interval: float = 0.1):
+    """
+    :param seconds: maximum wall-clock time in seconds. None means there is no limit.
+    :param interval: seconds between checks
+    :return: a context manager that enforces the limit
+    """
+    if seconds is None:
+        return NoLimit()
+    return TimeWatchdog(seconds, interval=interval)
+
+
+def get_time_limits(config: dict) -> Tuple[Union[float, None], Union[float, None]]:
+    """
+    Reads the time limits from the configuration keys:
+
+    * **timeLimit**: time limit of the solver, in seconds.
+    * **timeLimitGrace**: seconds the solver is allowed to go over the time limit (5 by default).
+
+    :param config: execution configuration
+    :return: the soft limit, after which the solver is asked to stop,
+      and the hard limit, after which its process is terminated. None if there is no time limit.
+    """
+    seconds = config.get("timeLimit")
+    if seconds is None:
+        return None, None
+    grace = config.get("timeLimitGrace", DEFAULT_GRACE)
+    return seconds + grace, seconds + 2 * grace
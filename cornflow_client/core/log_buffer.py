@@ -0,0 +1,105 @@
+"""
+Bounded in-memory stream for the logs of the solvers
+"""
+# Full imports
+import threading
+
+# Partial imports
+from collections import deque
+
+# maximum number of characters kept by default
+DEFAULT_LOG_SIZE = 10 * 1024 * 1024
+# number of chunks after which they are joined into one
+MAX_CHUNKS = 1024
+
+
+class LogBuffer:
+    """
+    A text stream that only keeps the last max_size characters written into it.
+    It can be used wherever a file is expected (e.g. in a logging.StreamHandler),
+    and it can be read from another thread while the solver writes into it.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_LOG_SIZE, forward=None):
+        """
+        :param max_size: maximum number of characters kept in memory
+        :param forward: optional stream where everything written is also written
+        """
+        self.max_size = max_size
+        self.forward = forward
+        # number of characters written and discarded since the creation
+        self.written = 0
+        self.dropped = 0
+        self._chunks = deque()
+        self._size = 0
+        self._read = 0
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        """
+        :param text: text to append
+        :return: the number of characters written
+        """
+        if not text:
+            return 0
+        with self._lock:
+            self.written += len(text)
+            self._chunks.append(text)
+            self._size += len(text)
+            self._truncate()
+            if len(self._chunks) > MAX_CHUNKS:
+                self._chunks = deque(["".join(self._chunks)])
+        if self.forward is not None:
+            self.forward.write(text)
+        return len(text)
+
+    def _truncate(self) -> None:
+        """
+        Discards the oldest characters until at most max_size are kept
+        """
+        while self._size > self.max_size:
+            first = self._chunks.popleft()
+            excess = self._size - self.max_size
+            if len(first) > excess:
+                self._chunks.appendleft(first[excess:])
+                removed = excess
+            else:
+                removed = len(first)
+            self._size -= removed
+            self.dropped += removed
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        """
+        :return: the text kept in the buffer
+        """
+        with self._lock:
+            value = "".join(self._chunks)
+            self._chunks = deque([value]) if value else deque()
+            return value
+
+    def read_new(self) -> str:
+        """
+        :return: the text written since the last call to this method,
+          limited to the text still kept in the buffer
+        """
+        with self._lock:
+            new = self.written - self._read
+            self._read = self.written
+        if not new:
+            return ""
+        return self.getvalue()[-new:]
+
+    def clear(self) -> None:
+        """
+        Discards the content of the buffer
+        """
+        with self._lock:
+            self._chunks = deque()
+            self._size = 0
+            self._read = self.written
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,111 @@
+"""
+Memoization of the methods of instances and solutions
+"""
+# Partial imports
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict
+
+_MISSING = object()
+
+
+class MemoCache:
+    """
+    The results of one method of one object, with its hit and miss statistics
+    """
+
+    def __init__(self, maxsize: int = None):
+        """
+        :param maxsize: maximum number of results kept. The least recently used ones are discarded.
+          None means there is no limit.
+        """
+        self.maxsize = maxsize
+        self.version = None
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        result = self.results.get(key, _MISSING)
+        if result is _MISSING:
+            self.misses += 1
+            return _MISSING
+        self.hits += 1
+        self.results.move_to_end(key)
+        return result
+
+    def set(self, key, result) -> None:
+        self.results[key] = result
+        if self.maxsize is not None and len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+            self.evictions += 1
+
+    def check_version(self, version) -> None:
+        """
+        Discards the results if they were computed with another version of the data
+        """
+        if self.version != version:
+            if self.results:
+                self.invalidations += 1
+            self.results.clear()
+            self.version = version
+
+    def stats(self) -> Dict[str, int]:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self.results),
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+        )
+
+
+def get_memo_caches(obj) -> Dict[str, MemoCache]:
+    """
+    :param obj: an object with memoized methods
+    :return: the caches of the object, by method name
+    """
+    return obj.__dict__.setdefault("_memo_caches", dict())
+
+
+def memoize(function: Callable = None, maxsize: int = None) -> Callable:
+    """
+    Decorator that keeps the results of a method of an instance or a solution, by arguments.
+    The results are discarded when the data of the object is assigned again
+    (see :py:attr:`InstanceSolutionCore.data_version`).
+    Changes made inside the data (e.g. adding a record to a table) do not discard them.
+
+    It can be used as @memoize or @memoize(maxsize=128), and below @property.
+    Calls with arguments that cannot be hashed are not memoized.
+
+    :param function: the method
+    :param maxsize: maximum number of results kept for each object (least recently used eviction).
+      None means there is no limit.
+    :return: the memoized method
+    """
+    if function is None:
+        return lambda f: memoize(f, maxsize=maxsize)
+
+    name = function.__qualname__
+
+    @wraps(function)
+    def wrapper(self, *args, **kwargs):
+        caches = get_memo_caches(self)
+        cache = caches.get(name)
+        if cache is None:
+            cache = caches[name] = MemoCache(maxsize)
+        cache.check_version(getattr(self, "data_version", None))
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            result = cache.get(key)
+        except TypeError:
+            # arguments that cannot be hashed
+            return function(self, *args, **kwargs)
+        if result is _MISSING:
+            result = function(self, *args, **kwargs)
+            cache.set(key, result)
+        return result
+
+    return wrapper
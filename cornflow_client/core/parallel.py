@@ -0,0 +1,214 @@
+"""
+Run several solvers at the same time, each one in its own process
+"""
+# Full imports
+import os
+import sys
+
+# Partial imports
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List, Tuple, Union
+
+# Imports from internal modules
+from .cancellation import stop_requested
+from .isolation import STOP_POLL_INTERVAL, IsolatedRun, min_timeout
+from .profiling import reset_peak_rss
+from cornflow_client.constants import (
+    STATUS_OPTIMAL,
+    STATUS_INFEASIBLE,
+    SENSE_MINIMIZE,
+)
+
+
+def is_proven(result: Dict) -> bool:
+    """
+    :param result: the result of a run
+    :return: True if the run proved optimality or infeasibility
+    """
+    return result["output"].get("status") in [STATUS_OPTIMAL, STATUS_INFEASIBLE]
+
+
+def objective_key(result: Dict, sense: int = SENSE_MINIMIZE) -> float:
+    """
+    :param result: the result of a run
+    :param sense: SENSE_MINIMIZE or SENSE_MAXIMIZE
+    :return: a value to sort the results from best to worst
+    """
+    if result["solution"] is None or result["objective"] is None:
+        return float("inf")
+    return sense * result["objective"]
+
+
+def select_best(
+    results: Dict[str, Dict], sense: int = SENSE_MINIMIZE
+) -> Union[str, None]:
+    """
+    Chooses the best run: the one with the best objective among those with a solution.
+    If no run has a solution, the first one that proved infeasibility is returned.
+
+    :param results: the results of the runs
+    :param sense: SENSE_MINIMIZE or SENSE_MAXIMIZE
+    :return: the name of the best run, None if there are no runs
+    """
+    with_solution = [name for name, result in results.items() if result["solution"]]
+    if with_solution:
+        return min(with_solution, key=lambda name: objective_key(results[name], sense))
+    proven = [name for name, result in results.items() if is_proven(result)]
+    if proven:
+        return proven[0]
+    return next(iter(results), None)
+
+
+def reaches_target(target: Union[float, None], sense: int = SENSE_MINIMIZE) -> Callable:
+    """
+    :param target: objective value that is good enough. None means there is no target.
+    :param sense: SENSE_MINIMIZE or SENSE_MAXIMIZE
+    :return: a function that returns True if a result proves optimality or infeasibility,
+      or has a solution at least as good as the target
+    """
+
+    def stop_when(result: Dict) -> bool:
+        if is_proven(result):
+            return True
+        if target is None or result["solution"] is None or result["objective"] is None:
+            return False
+        return sense * result["objective"] <= sense * target
+
+    return stop_when
+
+
+def run_parallel(
+    runs: Dict[str, IsolatedRun],
+    sense: int = SENSE_MINIMIZE,
+    stop_when: Callable[[Dict], bool] = is_proven,
+) -> Tuple[Union[str, None], Dict[str, Dict]]:
+    """
+    Starts all the runs and waits for them.
+    As soon as the result of one run satisfies stop_when, or a stop is requested
+    (see :py:func:`request_stop`), the runs still going on are stopped.
+    Each run also stops by itself when it reaches its time limit.
+    The runs are independent: the solutions found by one are not shared with the rest.
+
+    :param runs: a dictionary of runs that have not been started
+    :param sense: SENSE_MINIMIZE or SENSE_MAXIMIZE
+    :param stop_when: function that receives a result and returns True if the rest of the runs should stop
+    :return: the name of the best run and the results of all the runs, in the same order as runs
+    """
+    pending = dict(runs)
+    results = dict()
+    stop = False
+    try:
+        for run in runs.values():
+            run.start()
+        while pending and not stop:
+            limits = [run.remaining_time() for run in pending.values()]
+            timeout = None if None in limits else min(limits)
+            wait(
+                [run.sentinel for run in pending.values()],
+                min_timeout(timeout, STOP_POLL_INTERVAL),
+            )
+            stop = stop_requested()
+            for name, run in list(pending.items()):
+                if stop or (run.is_alive() and run.remaining_time() != 0):
+                    continue
+                results[name] = run.wait().collect()
+                pending.pop(name)
+                stop = stop_when(results[name])
+        # the runs still going on are asked to stop and return their solution
+        for name, run in pending.items():
+            results[name] = run.stop().collect()
+        pending = dict()
+    finally:
+        for run in pending.values():
+            run.stop()
+
+    results = {name: results[name] for name in runs if name in results}
+    return select_best(results, sense), results
+
+
+def summarize(results: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    :param results: the results of several runs
+    :return: the status, objective and time of each run, to store in the log
+    """
+    return {
+        name: dict(
+            status_code=result["output"].get("status"),
+            objective=result["objective"],
+            time=result["time"],
+            has_solution=result["solution"] is not None,
+        )
+        for name, result in results.items()
+    }
+
+
+def get_available_cores() -> int:
+    """
+    :return: the number of cores this process is allowed to use
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # not available in windows or macOS
+        return os.cpu_count() or 1
+
+
+def get_max_workers(configs: List[dict], max_workers: int = None) -> int:
+    """
+    Number of solves that can run at the same time without using more threads than cores.
+    The number of threads of each solve is read from the configuration key threads (1 by default).
+
+    :param configs: the configurations of the solves
+    :param max_workers: optional upper bound on the number of workers
+    :return: the number of workers
+    """
+    threads = max([config.get("threads", 1) for config in configs] + [1])
+    workers = max(get_available_cores() // threads, 1)
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    return workers
+
+
+def stop_executor(executor, futures) -> None:
+    """
+    Shuts down a pool of processes without waiting for the tasks that have not started.
+    The tasks that are already running finish in the background.
+
+    :param executor: the pool of processes
+    :param futures: the futures of the tasks submitted to the pool
+    """
+    for future in futures:
+        future.cancel()
+    if sys.version_info >= (3, 9):
+        executor.shutdown(wait=False, cancel_futures=True)
+    else:
+        executor.shutdown(wait=False)
+
+
+# the application used by the solves in each worker process
+_worker_app = None
+
+
+def init_worker(app) -> None:
+    """
+    Initializer of the worker processes: stores the application.
+    The validators compiled by the first solve in the worker are reused in the rest
+    (see :py:func:`cornflow_client.core.tools.get_validator`).
+    """
+    global _worker_app
+    _worker_app = app
+
+
+def solve_task(index: int, data: dict, config: dict) -> Tuple[int, Tuple]:
+    """
+    Solves one dataset in a worker process.
+
+    :return: the index of the task and the result of the solve method
+    """
+    # the worker is reused: its peak memory must not include the previous tasks
+    reset = reset_peak_rss()
+    result = _worker_app.solve(data, config)
+    profile = result[4].get("profile")
+    if not reset and profile is not None:
+        profile["peak_rss"] = None
+    return index, result
@@ -0,0 +1,219 @@
+"""
+Tools to measure the time and resources used by each phase of a solve
+"""
+# Full imports
+import cProfile
+import json
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+
+# Partial imports
+from contextlib import contextmanager
+from timeit import default_timer as timer
+from typing import Dict, List, Union
+
+try:
+    import resource
+except ImportError:
+    # resource is not available on windows
+    resource = None
+
+
+def get_peak_rss() -> Union[int, None]:
+    """
+    :return: the peak resident set size of the current process in bytes,
+      or None if it cannot be measured in this platform
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # macOS reports bytes, linux reports kilobytes
+        return peak
+    return peak * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Resets the peak resident set size of the current process to its current size,
+    so :py:func:`get_peak_rss` only measures what comes next (e.g. in a reused worker process).
+    It is only possible in linux.
+
+    :return: True if it was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def get_payload_size(data) -> int:
+    """
+    :param data: a json-serializable object
+    :return: the size in bytes of its compact json representation
+    """
+    # with ensure_ascii the string only has ascii characters: one byte per character
+    return len(json.dumps(data, separators=(",", ":")))
+
+
+class SolveProfile:
+    """
+    Collects the wall time and cpu time of each phase of a solve,
+    together with the size of the payloads involved and the peak memory of the process.
+    """
+
+    def __init__(self):
+        self.phases = dict()
+        self.sizes = dict()
+        self.conversion = dict()
+        self.capture = dict()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager that measures the block of code inside it as the phase name.
+        A phase measured more than once accumulates its times.
+
+        :param name: name of the phase
+        """
+        start_wall = timer()
+        start_cpu = time.process_time()
+        try:
+            yield self
+        finally:
+            self.add_phase(
+                name, wall=timer() - start_wall, cpu=time.process_time() - start_cpu
+            )
+
+    def add_phase(self, name: str, wall: float, cpu: float = None) -> None:
+        """
+        :param name: name of the phase
+        :param wall: wall time in seconds
+        :param cpu: cpu time in seconds
+        """
+        phase = self.phases.setdefault(name, dict(wall=0, cpu=0))
+        phase["wall"] += wall
+        if cpu is not None:
+            phase["cpu"] += cpu
+
+    def add_size(self, name: str, size: int) -> None:
+        """
+        :param name: name of the payload
+        :param size: size in bytes
+        """
+        self.sizes[name] = size
+
+    def add_conversion(self, name: str, seconds: Union[float, None]) -> None:
+        """
+        :param name: name of the converted object (instance or solution)
+        :param seconds: time spent converting the raw data into SuperDict
+        """
+        if seconds is not None:
+            self.conversion[name] = seconds
+
+    def to_dict(self) -> Dict:
+        """
+        :return: a json-serializable representation of the profile
+        """
+        result = dict(
+            phases=self.phases,
+            sizes=self.sizes,
+            conversion=self.conversion,
+            peak_rss=get_peak_rss(),
+        )
+        result.update(self.capture)
+        return result
+
+
+def get_capture_options(config: dict) -> Dict:
+    """
+    Reads the profiling options from the execution configuration:
+
+    * **profileCpu**: run the solver under cProfile
+    * **profileMemory**: run the solver under tracemalloc
+    * **profileTop**: number of hotspots and allocation sites to keep (20 by default)
+    * **profileSampleRate**: fraction of the executions that are profiled (1 by default).
+      Low rates allow to keep the profiling on in production.
+
+    :param config: execution configuration
+    :return: the keyword arguments for :py:func:`capture_hotspots`
+    """
+    cpu = config.get("profileCpu", False)
+    memory = config.get("profileMemory", False)
+    if (cpu or memory) and random.random() >= config.get("profileSampleRate", 1):
+        cpu = memory = False
+    return dict(cpu=cpu, memory=memory, top=config.get("profileTop", 20))
+
+
+@contextmanager
+def capture_hotspots(cpu: bool = False, memory: bool = False, top: int = 20):
+    """
+    Context manager that runs the code inside it under cProfile and / or tracemalloc.
+    Only the top entries are kept so the result is small enough to be stored in the log.
+    tracemalloc only records one frame per allocation to bound its overhead.
+
+    :param cpu: capture the cpu hotspots with cProfile
+    :param memory: capture the allocation sites with tracemalloc
+    :param top: number of entries to keep
+    :return: yields a dictionary that gets filled with the results on exit
+    """
+    result = dict()
+    profiler = None
+    started_tracing = False
+    if cpu:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start(1)
+        started_tracing = True
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            result["hotspots"] = get_hotspots(profiler, top)
+        if memory and tracemalloc.is_tracing():
+            result["allocations"] = get_allocations(tracemalloc.take_snapshot(), top)
+            result["traced_peak"] = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+
+
+def get_hotspots(profiler: cProfile.Profile, top: int = 20) -> List[Dict]:
+    """
+    :param profiler: a profiler that has already been run
+    :param top: number of functions to return
+    :return: the functions with the highest cumulative time
+    """
+    stats = pstats.Stats(profiler).stats
+    entries = sorted(stats.items(), key=lambda v: v[1][3], reverse=True)[:top]
+    return [
+        dict(
+            function=f"{filename}:{line}({name})",
+            calls=calls,
+            tottime=tottime,
+            cumtime=cumtime,
+        )
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in entries
+    ]
+
+
+def get_allocations(snapshot: tracemalloc.Snapshot, top: int = 20) -> List[Dict]:
+    """
+    :param snapshot: a tracemalloc snapshot
+    :param top: number of allocation sites to return
+    :return: the lines of code that hold more memory
+    """
+    return [
+        dict(
+            location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            size=stat.size,
+            count=stat.count,
+        )
+        for stat in snapshot.statistics("lineno")[:top]
+    ]
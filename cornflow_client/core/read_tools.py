@@ -2,23 +2,32 @@
 
 """
 # Full imports
-import math
 import warnings
 
 # Partial imports
 from pytups import TupList, SuperDict
-import numbers
 
+# Imports from internal modules
+from .coercion import coerce_column, coerce_records, format_value, get_coercer
 
-def read_excel(path: str, param_tables_names: list = None) -> dict:
+
+def read_excel(path: str, param_tables_names: list = None, schema: dict = None) -> dict:
     """
     Read an entire excel file.
+    Each sheet is read only once, streaming its rows.
 
     :param path: path of the excel file
     :param param_tables_names: names of the parameter tables
+    :param schema: optional json-schema of the data. If given, the values of each column
+      are converted to the type of the column in the schema.
     :return: a dict with a list of dict (records format) for each table.
     """
     is_xl_type(path)
+    if param_tables_names is None:
+        param_tables_names = []
+    if path.endswith(".xls"):
+        # openpyxl does not read the old excel format
+        return read_excel_pandas(path, param_tables_names, schema)
 
     try:
         import openpyxl
@@ -26,24 +35,109 @@ def read_excel(path: str, param_tables_names: list = None) -> dict:
         warnings.warn("You must install openpyxl package to use this method")
         raise Exception("You must install openpyxl package to use this method")
 
+    properties = (schema or dict()).get("properties", dict())
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        tables = dict()
+        for sheet in workbook.worksheets:
+            name = sheet.title
+            rows = (
+                row
+                for row in sheet.iter_rows(values_only=True)
+                if any(value is not None for value in row)
+            )
+            table_schema = properties.get(name, dict())
+            if name in param_tables_names:
+                tables[name] = read_param_rows(rows, table_schema)
+            else:
+                tables[name] = read_table_rows(rows, table_schema.get("items", dict()))
+    finally:
+        workbook.close()
+    return tables
+
+
+def read_table_rows(rows, table_schema: dict = None) -> TupList:
+    """
+    :param rows: an iterator of rows. The first one is the header.
+    :param table_schema: json-schema of the records
+    :return: a list of records
+    """
+    header = next(rows, None)
+    if header is None:
+        return TupList()
+    header = [
+        name if name is not None else f"Unnamed: {position}"
+        for position, name in enumerate(header)
+    ]
+    properties = (table_schema or dict()).get("properties", dict())
+    # the empty cells at the end of a row may not be read
+    width = len(header)
+    rows = (
+        row + (None,) * (width - len(row)) if len(row) < width else row for row in rows
+    )
+    columns = list(zip(*rows))
+    if not columns:
+        return TupList()
+    # each column is converted at once, with the conversion of its type
+    columns = [
+        coerce_column(column, properties.get(name))
+        for name, column in zip(header, columns)
+    ]
+    return TupList(SuperDict(zip(header, row)) for row in zip(*columns))
+
+
+def read_param_rows(rows, table_schema: dict = None) -> SuperDict:
+    """
+    :param rows: an iterator of rows with the name of the parameter and its value
+    :param table_schema: json-schema of the parameters
+    :return: a dict {param1: val1}
+    """
+    properties = (table_schema or dict()).get("properties", dict())
+    return SuperDict(
+        {
+            row[0]: get_coercer(properties.get(row[0]))(
+                row[1] if len(row) > 1 else None
+            )
+            for row in rows
+        }
+    )
+
+
+def read_excel_pandas(path: str, param_tables_names: list, schema: dict = None) -> dict:
+    """
+    Read an entire excel file with pandas.
+
+    :param path: path of the excel file
+    :param param_tables_names: names of the parameter tables
+    :param schema: optional json-schema of the data
+    :return: a dict with a list of dict (records format) for each table.
+    """
     try:
         import pandas as pd
     except (ModuleNotFoundError, ImportError):
         warnings.warn("You must install pandas package to use this method")
         raise Exception("You must install pandas package to use this method")
 
+    properties = (schema or dict()).get("properties", dict())
     data = pd.read_excel(path, sheet_name=None)
 
     data_tables = {
-        name: TupList(content.to_dict(orient="records")).vapply(
-            lambda v: SuperDict(v).vapply(lambda vv: format_value(vv))
+        name: TupList(
+            SuperDict(record)
+            for record in coerce_records(
+                content.to_dict(orient="list"),
+                properties.get(name, dict()).get("items"),
+            )
         )
         for name, content in data.items()
         if name not in param_tables_names
     }
 
     parameters_tables = {
-        t: SuperDict(read_param_table(path, t)).vapply(lambda v: format_value(v))
+        t: read_param_rows(
+            (tuple(row.values()) for row in read_excel_table(path, t, header=None)),
+            properties.get(t),
+        )
         for t in param_tables_names
     }
 
@@ -82,24 +176,6 @@ def read_excel_table(path: str, table: str, **kwargs):
     return data.to_dict(orient="records")
 
 
-def format_value(value):
-    """"""
-    if isinstance(value, str):
-        if value in ["TRUE", "True"]:
-            return True
-        if value in ["FALSE", "False"]:
-            return False
-        return value
-    if isinstance(value, bool):
-        return value
-
-    if not isinstance(value, numbers.Number):
-        return str(value)
-    if math.isnan(value):
-        return None
-    return value
-
-
 def is_xl_type(path: str):
     """
     Check if a path is an excel file. Raises an error if the file is not an excel file
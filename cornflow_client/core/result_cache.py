@@ -0,0 +1,126 @@
+"""
+Local cache of the results of the solve method
+"""
+# Full imports
+import os
+import pickle
+import time
+
+# Partial imports
+from typing import Tuple, Union
+
+# Imports from internal modules
+from .fingerprint import get_fingerprint
+
+CACHE_EXTENSION = ".pkl"
+# maximum size of the cache by default, in bytes
+DEFAULT_CACHE_SIZE = 1024**3
+# configuration keys that do not change the result of a solve
+NON_RESULT_KEYS = {"msg", "stopPollInterval", "stopOnSignal"}
+NON_RESULT_PREFIXES = ("profile", "log", "checkpoint")
+
+
+def get_result_key(
+    app_name: str,
+    solver: str,
+    solver_version,
+    data_hash: str,
+    config: dict,
+    solution_data: Union[dict, None] = None,
+) -> str:
+    """
+    :param app_name: name of the application
+    :param solver: name of the solver
+    :param solver_version: version of the solver class
+    :param data_hash: fingerprint of the instance data
+    :param config: execution configuration
+    :param solution_data: initial solution, if any
+    :return: the key of the result in the cache
+    """
+    config = {
+        key: value
+        for key, value in config.items()
+        if key not in NON_RESULT_KEYS and not key.startswith(NON_RESULT_PREFIXES)
+    }
+    solution_hash = None
+    if solution_data is not None:
+        solution_hash = get_fingerprint(solution_data)
+    return get_fingerprint(
+        [app_name, solver, str(solver_version), data_hash, config, solution_hash]
+    )
+
+
+class ResultCache:
+    """
+    Results of the solve method stored in a directory, one file per result.
+    When the files go over max_size bytes, the least recently used ones are removed.
+    The time of last use of each result is the modification time of its file.
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        :param directory: directory of the cache. It is created if it does not exist.
+        :param max_size: maximum size of the cache, in bytes
+        """
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_EXTENSION)
+
+    def get(self, key: str) -> Union[Tuple, None]:
+        """
+        :param key: key of the result (see :py:func:`get_result_key`)
+        :return: the result stored, None if there is none
+        """
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                result = pickle.load(f)
+            # the result becomes the most recently used.
+            # the time is given explicitly because the clock of the file system may be coarser
+            now = time.time_ns()
+            os.utime(path, ns=(now, now))
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return result
+
+    def set(self, key: str, result: Tuple) -> None:
+        """
+        Stores a result and removes the least recently used ones if the cache is too big.
+
+        :param key: key of the result (see :py:func:`get_result_key`)
+        :param result: the output of the solve method
+        """
+        path = self.get_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used results until the cache fits in max_size
+        """
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(CACHE_EXTENSION):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, filename))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, filename))
+        total = sum(size for _, size, _ in entries)
+        for _, size, filename in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, filename))
+            except OSError:
+                pass
+            total -= size
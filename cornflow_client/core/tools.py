@@ -6,8 +6,14 @@ import json
 import pickle
 
 # Partial imports
+from collections import OrderedDict
+from jsonschema import Draft7Validator
 from pytups import OrderSet
 
+# compiled validators, by schema
+_validators = OrderedDict()
+MAX_VALIDATORS = 32
+
 
 def new_set(seq):
     """
@@ -30,3 +36,24 @@ def save_json(data, path):
 
 def copy(dictionary):
     return pickle.loads(pickle.dumps(dictionary, -1))
+
+
+def get_validator(schema: dict) -> Draft7Validator:
+    """
+    Returns a validator for the schema, reusing the one compiled previously
+    for the same schema object. Only the last MAX_VALIDATORS schemas are kept.
+
+    :param schema: a json-schema
+    :return: a Draft7Validator for the schema
+    """
+    key = id(schema)
+    cached = _validators.get(key)
+    # the schema is stored with the validator so its id cannot be reused by another object
+    if cached is not None and cached[0] is schema:
+        _validators.move_to_end(key)
+        return cached[1]
+    validator = Draft7Validator(schema)
+    _validators[key] = (schema, validator)
+    if len(_validators) > MAX_VALIDATORS:
+        _validators.popitem(last=False)
+    return validator
@@ -0,0 +1,121 @@
+"""
+Write the data of instances and solutions into files
+"""
+# Full imports
+import datetime
+import math
+import numbers
+import warnings
+
+# Imports from internal modules
+from .columnar import get_column_names
+from .coercion import format_value, get_coercer
+from .read_tools import is_xl_type
+
+
+def write_excel(path: str, data: dict, schema: dict = None) -> None:
+    """
+    Write data to excel, streaming the rows into the file.
+    The memory used does not depend on the number of rows.
+
+    Each table of records is written into a sheet with a header.
+    Each table of lists is written into a sheet with the positions of the values as header.
+    Each dictionary is written into a sheet with one parameter per row, without header.
+    The rest of the tables are skipped with a warning.
+
+    :param path: path or name of the excel file
+    :param data: data in json format
+    :param schema: optional json-schema of the data. The columns are written in the order
+      of the schema and their values are converted to the type of the column.
+    :return: nothing
+    """
+    is_xl_type(path)
+    try:
+        import openpyxl
+    except (ModuleNotFoundError, ImportError):
+        warnings.warn("You must install openpyxl package to use this method")
+        raise Exception("You must install openpyxl package to use this method")
+
+    properties = (schema or dict()).get("properties", dict())
+    workbook = openpyxl.Workbook(write_only=True)
+    for table, content in data.items():
+        table_schema = properties.get(table, dict())
+        if isinstance(content, list) and all(isinstance(r, dict) for r in content):
+            sheet = workbook.create_sheet(table)
+            write_table_rows(sheet, content, table_schema.get("items", dict()))
+        elif isinstance(content, list) and all(
+            isinstance(r, (list, tuple)) for r in content
+        ):
+            sheet = workbook.create_sheet(table)
+            write_list_rows(sheet, content)
+        elif isinstance(content, dict):
+            sheet = workbook.create_sheet(table)
+            write_param_rows(sheet, content, table_schema)
+        else:
+            warnings.warn(f"The table {table} cannot be written into an excel sheet")
+    workbook.save(path)
+
+
+def write_table_rows(sheet, records: list, table_schema: dict = None) -> None:
+    """
+    :param sheet: a write-only sheet
+    :param records: a list of dict
+    :param table_schema: json-schema of the records
+    """
+    properties = (table_schema or dict()).get("properties", dict())
+    columns = get_column_names(records, properties)
+    converters = [get_cell_converter(properties.get(name)) for name in columns]
+    sheet.append(columns)
+    for record in records:
+        sheet.append(
+            [
+                converter(record.get(name))
+                for name, converter in zip(columns, converters)
+            ]
+        )
+
+
+def write_list_rows(sheet, rows: list) -> None:
+    """
+    :param sheet: a write-only sheet
+    :param rows: a list of lists
+    """
+    width = max((len(row) for row in rows), default=0)
+    sheet.append(list(range(width)))
+    for row in rows:
+        sheet.append([to_cell(value) for value in row])
+
+
+def write_param_rows(sheet, parameters: dict, table_schema: dict = None) -> None:
+    """
+    :param sheet: a write-only sheet
+    :param parameters: a dict {param1: val1}
+    :param table_schema: json-schema of the parameters
+    """
+    properties = (table_schema or dict()).get("properties", dict())
+    for name, value in parameters.items():
+        sheet.append([name, get_cell_converter(properties.get(name))(value)])
+
+
+def get_cell_converter(column_schema: dict = None):
+    """
+    :param column_schema: json-schema of a column
+    :return: a function that converts a value into something that can be written in a cell
+    """
+    converter = get_coercer(column_schema)
+    if converter is format_value:
+        return to_cell
+    return lambda value: to_cell(converter(value))
+
+
+def to_cell(value):
+    """
+    :param value: a value of the data
+    :return: the value to write in a cell. Values that are not numbers, strings or dates
+      are written as strings.
+    """
+    if value is None or isinstance(value, (str, bool, datetime.date, datetime.time)):
+        return value
+    if isinstance(value, numbers.Number):
+        return None if isinstance(value, float) and math.isnan(value) else value
+    return str(value)
@@ -0,0 +1,154 @@
+"""
+Infer a draft json-schema from a sample of the data.
+
+The tables of records are analyzed by columns: the types found in each column
+of the sampled rows are merged into the type of the column.
+"""
+# Full imports
+import random
+
+# Partial imports
+from genson import SchemaBuilder
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+SCHEMA_URI = "http://json-schema.org/schema#"
+
+JSON_TYPES = {
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    str: "string",
+    type(None): "null",
+}
+
+
+def sample_rows(
+    rows: Iterable,
+    sample_size: int,
+    head_size: int = None,
+    seed: int = 0,
+) -> Tuple[List, int]:
+    """
+    Takes the first head_size rows and a random sample of the rest (reservoir sampling),
+    in a single pass over the rows.
+
+    :param rows: the rows of a table
+    :param sample_size: maximum number of rows in the sample
+    :param head_size: number of rows taken from the beginning. Half of the sample by default.
+    :param seed: seed of the random sample
+    :return: the sampled rows and the total number of rows
+    """
+    if head_size is None:
+        head_size = sample_size // 2
+    head_size = min(head_size, sample_size)
+    rng = random.Random(seed)
+    if isinstance(rows, Sequence):
+        # the rows can be accessed by position: only the sampled ones are read
+        total = len(rows)
+        if total <= sample_size:
+            return list(rows), total
+        positions = rng.sample(range(head_size, total), sample_size - head_size)
+        return list(rows[:head_size]) + [rows[p] for p in sorted(positions)], total
+
+    sample = []
+    reservoir_size = sample_size - head_size
+    total = 0
+    for total, row in enumerate(rows, start=1):
+        if total <= sample_size:
+            sample.append(row)
+            continue
+        position = rng.randrange(total - head_size)
+        if position < reservoir_size:
+            sample[head_size + position] = row
+    return sample, total
+
+
+def get_value_schema(values: List) -> dict:
+    """
+    :param values: values of a column
+    :return: the json-schema of the values
+    """
+    types = set()
+    nested = []
+    for value in values:
+        json_type = JSON_TYPES.get(type(value))
+        if json_type is None:
+            nested.append(value)
+        else:
+            types.add(json_type)
+    if "integer" in types and "number" in types:
+        types.discard("integer")
+    if nested:
+        # objects and arrays inside a column are left to genson
+        builder = SchemaBuilder(schema_uri=None)
+        for value in nested:
+            builder.add_object(value)
+        schema = builder.to_schema()
+        if not types:
+            return schema
+        types.update(
+            schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        )
+        return dict(schema, type=sorted(types))
+    if len(types) == 1:
+        return dict(type=types.pop())
+    return dict(type=sorted(types))
+
+
+def get_records_schema(records: List[dict]) -> dict:
+    """
+    :param records: a list of dictionaries
+    :return: the json-schema of the records
+    """
+    columns = dict()
+    for record in records:
+        for name, value in record.items():
+            columns.setdefault(name, []).append(value)
+    required = sorted(
+        name for name, values in columns.items() if len(values) == len(records)
+    )
+    schema = dict(
+        type="object",
+        properties={name: get_value_schema(values) for name, values in columns.items()},
+    )
+    if required:
+        schema["required"] = required
+    return schema
+
+
+def infer_schema(
+    data: dict,
+    sample_size: int = 1000,
+    head_size: int = None,
+    seed: int = 0,
+) -> Tuple[dict, Dict[str, float]]:
+    """
+    Infers a draft json-schema from a sample of the rows of each table.
+
+    :param data: data in json format
+    :param sample_size: maximum number of rows analyzed in each table
+    :param head_size: number of rows taken from the beginning of each table (see :py:func:`sample_rows`)
+    :param seed: seed of the random samples
+    :return: the json-schema and, for each table, the confidence of its schema:
+      the fraction of its rows that was analyzed
+    """
+    properties = dict()
+    confidence = dict()
+    for name, content in data.items():
+        if isinstance(content, list) and content:
+            sample, total = sample_rows(content, sample_size, head_size, seed)
+            confidence[name] = len(sample) / total
+            if all(isinstance(row, dict) for row in sample):
+                items = get_records_schema(sample)
+            else:
+                items = get_value_schema(sample)
+            properties[name] = dict(type="array", items=items)
+        else:
+            builder = SchemaBuilder(schema_uri=None)
+            builder.add_object(content)
+            properties[name] = builder.to_schema()
+            confidence[name] = 1
+    schema = {"$schema": SCHEMA_URI, "type": "object", "properties": properties}
+    if properties:
+        schema["required"] = sorted(properties)
+    return schema, confidence
@@ -2,6 +2,7 @@
 Class to help create and manage data schema and to validate json files.
 """
 # Full imports
+import json
 import os
 
 # Partial imports
@@ -12,6 +13,7 @@ from jsonschema import Draft7Validator
 
 # Imports form internal modules
 from .dictSchema import DictSchema
+from .inference import infer_schema
 from cornflow_client.core.tools import load_json, save_json
 
 
@@ -171,22 +173,26 @@ class SchemaManager:
         """
         self.save_json(self.to_dict_schema(), path)
 
-    def draft_schema_from(self, path, save_path=None):
+    def draft_schema_from(self, path, save_path=None, sample_size=None):
         """
         Create a draft jsonschema from a json file of data.
 
         :param path: path to the json file.
         :param save_path: path where to save the generated schema.
+        :param sample_size: if given, the schema is inferred from a sample of this number of rows
+          of each table instead of from all the data.
 
         :return: the generated schema.
         """
         file = self.load_json(path)
 
-        builder = SchemaBuilder()
-        builder.add_schema({"type": "object", "properties": {}})
-        builder.add_object(file)
-
-        draft_schema = builder.to_json()
+        if sample_size is not None:
+            draft_schema = json.dumps(infer_schema(file, sample_size)[0])
+        else:
+            builder = SchemaBuilder()
+            builder.add_schema({"type": "object", "properties": {}})
+            builder.add_object(file)
+            draft_schema = builder.to_json()
         if save_path is not None:
             with open(save_path, "w") as outfile:
                 outfile.write(draft_schema)
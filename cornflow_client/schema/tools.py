@@ -34,13 +34,15 @@ def get_empty_schema(properties=None, solvers=None):
     return schema
 
 
-def schema_from_excel(path_in, param_tables=None, path_out=None):
+def schema_from_excel(path_in, param_tables=None, path_out=None, sample_size=None):
     """
     Create a jsonschema based on an excel data file.
 
     :param path_in: path of the excel file
     :param param_tables: array containing the names of the parameter tables
     :param path_out: path where to save the json schema as a json file.
+    :param sample_size: if given, the schema is inferred from a sample of this number of rows
+      of each table instead of from all the data.
     :return: the jsonschema
     """
     if not param_tables:
@@ -52,7 +54,7 @@ def schema_from_excel(path_in, param_tables=None, path_out=None):
         schema = {}
 
     instance = InstSol(data)
-    schema = instance.generate_schema()
+    schema = instance.generate_schema(sample_size)
 
     if path_out is not None:
         with open(path_out, "w") as f:
@@ -0,0 +1,88 @@
+"""
+Compares cloning a large instance with tools.copy (pickle round trip)
+and with the copy-on-write clone, when the clone modifies a few records,
+modifies one whole table, or reads all the data.
+
+Usage: python -m cornflow_client.tests.benchmark.bench_clone [size] [clones]
+"""
+import sys
+import tracemalloc
+from timeit import default_timer as timer
+
+from cornflow_client import InstanceCore
+from cornflow_client.core.tools import copy
+from cornflow_client.schema.tools import get_empty_schema
+
+
+class DictInstance(InstanceCore):
+    schema = get_empty_schema()
+
+
+def get_fixture(size):
+    return dict(
+        parameters=dict(horizon=size, name="benchmark"),
+        nodes=[dict(id=i, x=i, y=-i, demand=i % 7) for i in range(size)],
+        arcs=[dict(n1=i, n2=i + 1, cost=1.5 * i) for i in range(size)],
+        assignments=[dict(node=i, vehicle=i % 10) for i in range(size)],
+    )
+
+
+def modify_records(data):
+    data["assignments"][0]["vehicle"] = -1
+    data["assignments"][-1]["vehicle"] = -1
+
+
+def modify_table(data):
+    for record in data["assignments"]:
+        record["vehicle"] += 1
+
+
+def read_all(data):
+    sum(record["cost"] for record in data["arcs"])
+    sum(record["x"] for record in data["nodes"])
+
+
+def clone_with_copy(instance):
+    return DictInstance.from_dict(copy(instance.data))
+
+
+def clone_with_cow(instance):
+    return instance.clone()
+
+
+def run(clone, use, instance, clones):
+    # the clones are kept, as a heuristic keeping a population of solutions
+    population = []
+    for _ in range(clones):
+        other = clone(instance)
+        use(other.data)
+        population.append(other)
+
+
+def measure(clone, use, instance, clones):
+    start = timer()
+    run(clone, use, instance, clones)
+    elapsed = timer() - start
+    # the memory is measured apart because tracing slows down the execution
+    tracemalloc.start()
+    run(clone, use, instance, clones)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size=100000, clones=10):
+    instance = DictInstance.from_dict(get_fixture(size))
+    print(f"{'usage':<16} {'method':<8} {'time (s)':>10} {'peak (MB)':>10}")
+    for name, use in [
+        ("modify records", modify_records),
+        ("modify table", modify_table),
+        ("read all", read_all),
+    ]:
+        for method, clone in [("copy", clone_with_copy), ("clone", clone_with_cow)]:
+            elapsed, peak = measure(clone, use, instance, clones)
+            print(f"{name:<16} {method:<8} {elapsed:>10.3f} {peak / 1024 ** 2:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
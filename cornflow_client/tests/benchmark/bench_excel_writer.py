@@ -0,0 +1,59 @@
+"""
+Compares the throughput and memory of the streaming excel writer with the previous pandas writer.
+
+Usage: python -m cornflow_client.tests.benchmark.bench_excel_writer [rows]
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+from timeit import default_timer as timer
+
+from cornflow_client.core.write_tools import write_excel
+
+
+def write_excel_pandas(path, data):
+    import pandas as pd
+
+    with pd.ExcelWriter(path) as writer:
+        for table, content in data.items():
+            pd.DataFrame.from_records(content).to_excel(writer, table, index=False)
+
+
+def get_fixture(rows):
+    return dict(
+        assignments=[
+            dict(task=i, worker=f"w{i % 50}", start=1.5 * i, done=i % 2 == 0)
+            for i in range(rows)
+        ]
+    )
+
+
+def measure(function, path, data):
+    # the time is measured without tracing the memory, which slows down the writers
+    start = timer()
+    function(path, data)
+    elapsed = timer() - start
+    tracemalloc.start()
+    function(path, data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(rows=100000):
+    data = get_fixture(rows)
+    writers = [
+        ("stream", lambda path, data: write_excel(path, data)),
+        ("pandas", write_excel_pandas),
+    ]
+    print(f"{'writer':<8} {'rows/s':>10} {'peak (MB)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, function in writers:
+            path = os.path.join(directory, f"{name}.xlsx")
+            elapsed, peak = measure(function, path, data)
+            print(f"{name:<8} {rows / elapsed:>10.0f} {peak / 1024 ** 2:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,65 @@
+"""
+Compares the time and memory needed to hash the data of the test fixtures with the fingerprint
+and with a sha256 of json.dumps(sort_keys=True). The tables of the fixtures are repeated
+to get larger data.
+
+Usage: python -m cornflow_client.tests.benchmark.bench_fingerprint [repetitions]
+"""
+import hashlib
+import json
+import os
+import sys
+import tracemalloc
+from timeit import default_timer as timer
+
+from cornflow_client.core.fingerprint import get_fingerprint
+
+FIXTURES = [
+    "gc_input.json",
+    "hk_data_input.json",
+    "instance-hackathon2.json",
+    "pulp_example_data.json",
+]
+
+
+def load_fixture(name):
+    path = os.path.join(os.path.dirname(__file__), "..", "data", name)
+    with open(path) as f:
+        return json.load(f)
+
+
+def repeat_tables(data, repetitions):
+    return {
+        name: content * repetitions if isinstance(content, list) else content
+        for name, content in data.items()
+    }
+
+
+def json_hash(data):
+    content = json.dumps(data, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def measure(function, data):
+    start = timer()
+    function(data)
+    elapsed = timer() - start
+    # the memory is measured apart because tracing slows down the execution
+    tracemalloc.start()
+    function(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(repetitions=200):
+    print(f"{'fixture':<26} {'method':<12} {'time (s)':>10} {'peak (MB)':>10}")
+    for name in FIXTURES:
+        data = repeat_tables(load_fixture(name), repetitions)
+        for method, function in [("json", json_hash), ("fingerprint", get_fingerprint)]:
+            elapsed, peak = measure(function, data)
+            print(f"{name:<26} {method:<12} {elapsed:>10.3f} {peak / 1024 ** 2:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
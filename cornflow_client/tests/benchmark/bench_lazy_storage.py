@@ -0,0 +1,57 @@
+"""
+Compares the time and memory needed to wrap a large instance with the default and the lazy storage.
+
+Usage: python -m cornflow_client.tests.benchmark.bench_lazy_storage [size]
+"""
+import sys
+import tracemalloc
+from timeit import default_timer as timer
+
+from cornflow_client import InstanceCore
+from cornflow_client.constants import STORAGE_LAZY
+from cornflow_client.schema.tools import get_empty_schema
+
+
+class DictInstance(InstanceCore):
+    schema = get_empty_schema()
+
+
+class LazyInstance(InstanceCore):
+    schema = get_empty_schema()
+    storage = STORAGE_LAZY
+
+
+def get_fixture(size):
+    return dict(
+        parameters=dict(horizon=size, name="benchmark"),
+        nodes={str(i): dict(x=i, y=-i, demand=dict(a=i, b=2 * i)) for i in range(size)},
+        arcs=[dict(n1=i, n2=i + 1, cost=1.5 * i) for i in range(size)],
+    )
+
+
+def measure(instance_class, data, access):
+    tracemalloc.start()
+    start = timer()
+    instance = instance_class.from_dict(data)
+    if access:
+        sum(node["demand"]["a"] for node in instance.data["nodes"].values())
+    instance.to_dict()
+    elapsed = timer() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(size=200000):
+    data = get_fixture(size)
+    print(f"{'storage':<8} {'access':<8} {'time (s)':>10} {'peak (MB)':>10}")
+    for access in [False, True]:
+        for name, instance_class in [("dict", DictInstance), ("lazy", LazyInstance)]:
+            elapsed, peak = measure(instance_class, data, access)
+            print(
+                f"{name:<8} {str(access):<8} {elapsed:>10.3f} {peak / 1024 ** 2:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -5,8 +5,31 @@ from cornflow_client import (
     ExperimentCore,
     get_empty_schema,
 )
-from cornflow_client.constants import BadConfiguration, BadInstance
+from cornflow_client.constants import (
+    BadConfiguration,
+    BadInstance,
+    STATUS_MEMORY_LIMIT,
+    STATUS_NOT_SOLVED,
+    STATUS_TIME_LIMIT,
+    SOLUTION_STATUS_FEASIBLE,
+    TimeLimitExceeded,
+)
+from cornflow_client.core.benchmark import compare_benchmarks
+from cornflow_client.core.cancellation import clear_stop, set_stop_file
+from cornflow_client.core.limits import (
+    NoLimit,
+    get_current_rss,
+    memory_limit,
+    time_limit,
+)
+from cornflow_client.core.log_buffer import DEFAULT_LOG_SIZE, LogBuffer
+from cornflow_client.core.result_cache import ResultCache
+import os
+import tempfile
+import time
 import unittest
+from unittest.mock import patch
+from timeit import default_timer as timer
 
 
 class TestABC(unittest.TestCase):
@@ -27,6 +50,21 @@ class TestABC(unittest.TestCase):
     def test_experiment(self):
         GoodExperiment(GoodInstanceClass(dict()), GoodSolutionClass(dict()))
 
+    def test_experiment_should_stop(self):
+        experiment = GoodExperiment(
+            GoodInstanceClass(dict()), GoodSolutionClass(dict())
+        )
+        self.assertFalse(experiment.should_stop())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "stop")
+            set_stop_file(path, interval=0)
+            self.assertFalse(experiment.should_stop())
+            open(path, "w").close()
+            self.assertTrue(experiment.should_stop())
+        set_stop_file(None)
+        clear_stop()
+        self.assertFalse(experiment.should_stop())
+
     def test_bad_experiment(self):
         must_fail = lambda: BadExperiment(
             GoodInstanceClass(dict()), GoodSolutionClass(dict())
@@ -58,6 +96,299 @@ class TestABC(unittest.TestCase):
         must_fail = lambda: GoodApp().solve(data=dict(number=""), config=dict())
         self.assertRaises(BadInstance, must_fail)
 
+    def test_solve_profile(self):
+        _, _, _, _, log = GoodApp().solve(data=dict(number=1), config=dict(msg=False))
+        profile = log["profile"]
+        for phase in ["validation", "instance", "instance_schema", "solve"]:
+            self.assertIn(phase, profile["phases"])
+            self.assertGreaterEqual(profile["phases"][phase]["wall"], 0)
+        self.assertIn("instance", profile["conversion"])
+
+    def test_solve_compiled_instance(self):
+        with tempfile.TemporaryDirectory() as path:
+            class CompiledApp(GoodApp):
+                compiled_instances_dir = path
+
+            app = CompiledApp()
+            config = dict(msg=False, solver="fast")
+            _, _, _, _, log = app.solve(data=dict(number=1), config=config)
+            self.assertIn("instance_compile", log["profile"]["phases"])
+            self.assertEqual(
+                len([f for f in os.listdir(path) if f.endswith(".pkl")]), 1
+            )
+            solution, _, _, _, log = app.solve(data=dict(number=1), config=config)
+            self.assertNotIn("instance_schema", log["profile"]["phases"])
+            self.assertNotIn("instance_compile", log["profile"]["phases"])
+            self.assertEqual(solution, dict(a=2))
+
+    def test_solve_result_cache(self):
+        with tempfile.TemporaryDirectory() as path:
+
+            class CachedApp(GoodApp):
+                result_cache_dir = path
+
+            app = CachedApp()
+            config = dict(msg=False, solver="fast")
+            first = app.solve(data=dict(number=1), config=config)
+            self.assertNotIn("cached", first[4])
+            second = app.solve(data=dict(number=1), config=dict(config, msg=True))
+            self.assertTrue(second[4]["cached"])
+            self.assertEqual(first[:4], second[:4])
+            other = app.solve(data=dict(number=2), config=config)
+            self.assertNotIn("cached", other[4])
+            # the seeded solver is not deterministic
+            config = dict(msg=False, solver="seeded", seed=1)
+            app.solve(data=dict(number=1), config=config)
+            _, _, _, _, log = app.solve(data=dict(number=1), config=config)
+            self.assertNotIn("cached", log)
+            # the default solver does not have a version
+            config = dict(msg=False, solver="default")
+            app.solve(data=dict(number=1), config=config)
+            _, _, _, _, log = app.solve(data=dict(number=1), config=config)
+            self.assertNotIn("cached", log)
+
+    def test_result_cache_eviction(self):
+        with tempfile.TemporaryDirectory() as path:
+            cache = ResultCache(path, max_size=0)
+            cache.set("a", (1,))
+            self.assertIsNone(cache.get("a"))
+            cache = ResultCache(path)
+            cache.set("a", (1,))
+            cache.set("b", (2,))
+            self.assertEqual(cache.get("a"), (1,))
+            size = os.path.getsize(cache.get_path("a"))
+            cache.max_size = size
+            cache.evict()
+            self.assertEqual(cache.get("a"), (1,))
+            self.assertIsNone(cache.get("b"))
+
+    def test_solve_capture_hotspots(self):
+        config = dict(msg=False, profileCpu=True, profileMemory=True, profileTop=5)
+        _, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        profile = log["profile"]
+        self.assertLessEqual(len(profile["hotspots"]), 5)
+        self.assertIn("allocations", profile)
+
+    def test_solve_capture_sample_rate(self):
+        config = dict(msg=False, profileCpu=True, profileSampleRate=0)
+        _, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertNotIn("hotspots", log["profile"])
+
+    @unittest.skipIf(get_current_rss() is None, "the memory cannot be measured")
+    def test_solve_memory_limit(self):
+        max_memory = get_current_rss() // (1024 * 1024) + 50
+        config = dict(msg=False, maxMemory=max_memory, solver="hungry")
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["status_code"], STATUS_MEMORY_LIMIT)
+        self.assertEqual(log["sol_code"], SOLUTION_STATUS_FEASIBLE)
+        self.assertEqual(solution, dict(a=1))
+
+    def test_memory_limit_not_measured(self):
+        with patch("cornflow_client.core.limits.get_current_rss", return_value=None):
+            with self.assertWarns(UserWarning):
+                limit = memory_limit(10)
+        self.assertIsInstance(limit, NoLimit)
+
+    def test_time_limit_caught(self):
+        start = timer()
+        with self.assertRaises(TimeLimitExceeded):
+            with time_limit(0.2, interval=0.05):
+                while timer() - start < 3:
+                    try:
+                        time.sleep(0.01)
+                    except Exception:
+                        pass
+        self.assertLess(timer() - start, 1)
+
+    def test_solve_isolated(self):
+        config = dict(msg=False, isolated=True)
+        solution, checks, _, _, log = GoodApp().solve(
+            data=dict(number=1), config=config
+        )
+        self.assertEqual(log["status_code"], 1)
+        self.assertEqual(checks, dict())
+
+    def test_solve_isolated_time_limit(self):
+        config = dict(
+            msg=False, isolated=True, solver="slow", timeLimit=0.2, timeLimitGrace=0.3
+        )
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["status_code"], STATUS_TIME_LIMIT)
+        self.assertEqual(solution, dict(a=1))
+        self.assertLess(log["time"], 5)
+
+    def test_solve_isolated_incumbent(self):
+        config = dict(
+            msg=False,
+            isolated=True,
+            solver="blocked",
+            timeLimit=0.1,
+            timeLimitGrace=0.2,
+        )
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["status_code"], STATUS_TIME_LIMIT)
+        self.assertEqual(solution, dict(a=1))
+        self.assertLess(log["time"], 5)
+
+    def test_solve_isolated_crash(self):
+        config = dict(msg=False, isolated=True, solver="crash")
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["status_code"], STATUS_NOT_SOLVED)
+        self.assertIn("error", log)
+        self.assertIsNone(solution)
+
+    def test_solve_portfolio_optimal(self):
+        config = dict(msg=False, portfolio=["slow", "default"])
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        # the slow solver is stopped and returns its solution
+        self.assertEqual(log["portfolio"]["default"]["status_code"], 1)
+        self.assertEqual(log["portfolio"]["slow"]["status_code"], 2)
+        self.assertEqual(log["solver"], "slow")
+        self.assertEqual(solution, dict(a=1))
+        self.assertLess(log["time"], 5)
+
+    def test_solve_portfolio_best_objective(self):
+        config = dict(
+            msg=False, portfolio=["fast", "slow"], timeLimit=0.2, timeLimitGrace=0.3
+        )
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["solver"], "slow")
+        self.assertEqual(solution, dict(a=1))
+        self.assertEqual(log["portfolio"]["fast"]["objective"], 5)
+        self.assertEqual(log["portfolio"]["slow"]["objective"], 1)
+
+    def test_solve_incumbent_callbacks(self):
+        app = GoodApp()
+        incumbents = []
+        app.incumbent_callbacks.append(lambda sol, obj: incumbents.append(obj))
+        config = dict(msg=False, solver="improving")
+        solution, _, _, _, _ = app.solve(data=dict(number=1), config=config)
+        self.assertEqual(incumbents, [3, 2, 1])
+        self.assertEqual(solution, dict(a=1))
+
+    def test_incumbent_callbacks_without_init(self):
+        incumbents = []
+        experiment = NoInitExperiment(GoodInstanceClass(dict(number=1)))
+        experiment.report_incumbent()
+        experiment.add_incumbent_callback(lambda sol, obj: incumbents.append(obj))
+        experiment.solve(dict())
+        self.assertEqual(incumbents, [3, 2, 1])
+
+    def test_solve_log_stream(self):
+        app = GoodApp()
+        app.log_stream = LogBuffer()
+        config = dict(msg=False, solver="improving", logMaxSize=26)
+        _, _, _, log_txt, _ = app.solve(data=dict(number=1), config=config)
+        self.assertEqual(log_txt, "objective: 2\nobjective: 1\n")
+        self.assertEqual(app.log_stream.max_size, DEFAULT_LOG_SIZE)
+        _, _, _, log_txt, _ = app.solve(data=dict(number=1), config=config)
+        self.assertEqual(log_txt, "objective: 2\nobjective: 1\n")
+        self.assertEqual(app.log_stream.getvalue(), ("objective: 3\n" + log_txt) * 2)
+
+    def test_log_buffer(self):
+        stream = LogBuffer(max_size=10)
+        for i in range(5000):
+            stream.write(str(i % 10))
+        self.assertEqual(stream.getvalue(), "0123456789")
+        self.assertEqual(stream.read_new(), "0123456789")
+        stream.write("abc")
+        self.assertEqual(stream.read_new(), "abc")
+        self.assertEqual(stream.read_new(), "")
+        self.assertEqual(stream.getvalue(), "3456789abc")
+
+    def test_solve_many(self):
+        datasets = [dict(number=1), dict(number=""), dict(number=3)]
+        results = list(
+            GoodApp().solve_many(datasets, dict(msg=False), max_workers=2)
+        )
+        self.assertEqual(sorted(index for index, _, _ in results), [0, 1, 2])
+        for index, result, error in results:
+            if index == 1:
+                self.assertIsInstance(error, BadInstance)
+            else:
+                self.assertIsNone(error)
+                self.assertEqual(result[4]["status_code"], 1)
+
+    def test_solve_many_time_limit(self):
+        config = dict(msg=False, solver="slow")
+        results = list(
+            GoodApp().solve_many([dict(number=1)], config, task_time_limit=0.2)
+        )
+        _, result, error = results[0]
+        self.assertIsNone(error)
+        self.assertEqual(result[4]["status_code"], STATUS_TIME_LIMIT)
+        self.assertEqual(result[0], dict(a=1))
+
+    def test_solve_many_config_time_limit(self):
+        configs = [
+            dict(msg=False, solver="grace", timeLimit=10),
+            dict(msg=False, solver="grace"),
+        ]
+        results = GraceApp().solve_many(
+            [dict(number=1)] * 2, configs, task_time_limit=5
+        )
+        graces = {index: result[0]["grace"] for index, result, _ in results}
+        # the limit of the configuration keeps its grace
+        self.assertEqual(graces, {0: None, 1: 0})
+
+    def test_solve_many_close(self):
+        slow = dict(msg=False, solver="slow", timeLimit=1, timeLimitGrace=0)
+        configs = [dict(msg=False)] + [slow] * 10
+        start = time.time()
+        results = GoodApp().solve_many([dict(number=1)] * 11, configs, max_workers=1)
+        index, _, error = next(results)
+        results.close()
+        # the solves that have not started are cancelled
+        self.assertEqual(index, 0)
+        self.assertIsNone(error)
+        self.assertLess(time.time() - start, 5)
+
+    def test_solve_multi_start(self):
+        config = dict(msg=False, solver="seeded", multiStart=4)
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["seed"], 2)
+        self.assertEqual(solution, dict(a=2))
+        self.assertEqual(len(log["multi_start"]), 4)
+
+    def test_solve_multi_start_target(self):
+        config = dict(
+            msg=False,
+            solver="seeded",
+            multiStart=2,
+            seeds=[3, 7],
+            targetObjective=1,
+            timeLimitGrace=0.1,
+        )
+        solution, _, _, _, log = GoodApp().solve(data=dict(number=1), config=config)
+        self.assertEqual(log["seed"], 3)
+        self.assertLess(log["time"], 0.9)
+
+    def test_benchmark(self):
+        records = GoodApp().benchmark(solvers=["default", "fast"], repetitions=2)
+        self.assertEqual(len(records), 4)
+        fast = [r for r in records if r["solver"] == "fast"]
+        self.assertEqual([r["objective"] for r in fast], [5, 5])
+        self.assertEqual([r["repetition"] for r in fast], [0, 1])
+        self.assertEqual(compare_benchmarks(records, records), [])
+
+    def test_benchmark_peak_rss(self):
+        # the second solve reuses the worker of the first one
+        records = GoodApp().benchmark(solvers=["hungry", "default"], max_workers=1)
+        hungry, default = records
+        if default["peak_rss"] is not None:
+            self.assertLess(default["peak_rss"], hungry["peak_rss"] - 200 * 1024**2)
+
+    def test_benchmark_objective_error(self):
+        records = ObjectiveErrorApp().benchmark(solvers=["error"], max_workers=1)
+        self.assertIsNone(records[0]["error"])
+        self.assertIsNone(records[0]["objective"])
+
+    def test_compare_benchmarks(self):
+        old = [dict(case=0, solver="a", time=1, objective=5, error=None, status_code=1)]
+        new = [dict(case=0, solver="a", time=2, objective=6, error=None, status_code=1)]
+        regressions = compare_benchmarks(old, new)
+        self.assertEqual({r["metric"] for r in regressions}, {"time", "objective"})
+
 
 class GoodInstanceClass(InstanceCore):
     schema = get_empty_schema(dict(number=dict(type="number")))
@@ -91,6 +422,101 @@ class GoodExperiment(ExperimentCore):
         return dict()
 
 
+class MemoryHungryExperiment(GoodExperiment):
+    def solve(self, options: dict):
+        self.solution = GoodSolutionClass(dict(a=1))
+        chunks = []
+        # at most 500 Mb, the memory limit should stop it before
+        for _ in range(50):
+            chunks.append(bytearray(10 * 1024 * 1024))
+            time.sleep(0.02)
+        return dict(status=1)
+
+
+class FeasibleExperiment(GoodExperiment):
+    version = "1"
+
+    def solve(self, options: dict):
+        self.solution = GoodSolutionClass(dict(a=2))
+        return dict(status=2)
+
+    def get_objective(self) -> float:
+        return 5
+
+
+class SeededExperiment(GoodExperiment):
+    version = "1"
+    deterministic = False
+
+    def solve(self, options: dict):
+        seed = options["seed"]
+        self.solution = GoodSolutionClass(dict(a=seed))
+        # the worse seeds take longer
+        time.sleep(0.2 * self.get_objective())
+        return dict(status=2)
+
+    def get_objective(self) -> float:
+        return abs(self.solution.data["a"] - 2)
+
+
+class ImprovingExperiment(GoodExperiment):
+    def solve(self, options: dict):
+        for value in [3, 2, 1]:
+            self.solution = GoodSolutionClass(dict(a=value))
+            self.report_incumbent()
+            print(f"objective: {value}", file=self.log_stream)
+            time.sleep(0.05)
+        return dict(status=2)
+
+    def get_objective(self) -> float:
+        return self.solution.data["a"]
+
+
+class NoInitExperiment(ImprovingExperiment):
+    def __init__(self, instance, solution=None):
+        # does not call the __init__ of the parent class
+        self._instance = instance
+        self.solution = solution
+
+
+class BlockedExperiment(GoodExperiment):
+    def solve(self, options: dict):
+        self.solution = GoodSolutionClass(dict(a=1))
+        self.report_incumbent()
+        # like native code: it cannot be interrupted
+        time.sleep(30)
+        return dict(status=1)
+
+
+class SlowExperiment(GoodExperiment):
+    def solve(self, options: dict):
+        self.solution = GoodSolutionClass(dict(a=1))
+        # ignores the time limit
+        for _ in range(1000):
+            if self.should_stop():
+                return dict(status=2)
+            time.sleep(0.01)
+        return dict(status=1)
+
+
+class CrashingExperiment(GoodExperiment):
+    def solve(self, options: dict):
+        self.solution = GoodSolutionClass(dict(a=1))
+        os._exit(3)
+
+
+class GraceExperiment(FeasibleExperiment):
+    def solve(self, options: dict):
+        grace = options.get("timeLimitGrace")
+        self.solution = GoodSolutionClass(dict(a=2, grace=grace))
+        return dict(status=2)
+
+
+class ObjectiveErrorExperiment(FeasibleExperiment):
+    def get_objective(self) -> float:
+        raise ValueError("no objective")
+
+
 class BadExperiment(ExperimentCore):
     def solve(self, options) -> dict:
         return dict()
@@ -100,11 +526,34 @@ class GoodApp(ApplicationCore):
     name = "123"
     instance = GoodInstanceClass
     solution = GoodSolutionClass
-    solvers = dict(default=GoodExperiment)
-    schema = get_empty_schema(dict(timeLimit=dict(type="number")), solvers=["default"])
+    solvers = dict(
+        default=GoodExperiment,
+        hungry=MemoryHungryExperiment,
+        slow=SlowExperiment,
+        crash=CrashingExperiment,
+        fast=FeasibleExperiment,
+        seeded=SeededExperiment,
+        improving=ImprovingExperiment,
+        blocked=BlockedExperiment,
+    )
+    schema = get_empty_schema(
+        dict(timeLimit=dict(type="number")), solvers=list(solvers.keys())
+    )
     test_cases = [dict()]
 
 
+class GraceApp(GoodApp):
+    solvers = dict(GoodApp.solvers, grace=GraceExperiment)
+    schema = get_empty_schema(
+        dict(timeLimit=dict(type="number")), solvers=list(solvers.keys())
+    )
+
+
+class ObjectiveErrorApp(GoodApp):
+    solvers = dict(GoodApp.solvers, error=ObjectiveErrorExperiment)
+    schema = get_empty_schema(solvers=list(solvers.keys()))
+
+
 class ConcatenatedSolver(ApplicationCore):
     name = "123"
     instance = GoodInstanceClass
@@ -1,9 +1,17 @@
+import signal
+import time
 import unittest
 from cornflow_client.airflow import dag_utilities as du
+from cornflow_client.core.cancellation import clear_stop, stop_requested
+from cornflow_client.core.profiling import get_peak_rss
+from cornflow_client.tests.unit.test_abc import GoodApp
 from unittest.mock import Mock, patch
 
 
 class DagUtilities(unittest.TestCase):
+    def tearDown(self):
+        clear_stop()
+
     @patch("cornflow_client.airflow.dag_utilities.CornFlow")
     def test_env_connection_vars(self, CornFlow):
         secrets = Mock()
@@ -38,3 +46,135 @@ class DagUtilities(unittest.TestCase):
                 username=user_info[0], pwd=user_info[1]
             )
             CornFlow.assert_called_with(url=url)
+
+    @patch("cornflow_client.airflow.dag_utilities.connect_to_cornflow")
+    def test_cf_solve_profile(self, connect_to_cornflow):
+        client = connect_to_cornflow.return_value
+        client.get_data.return_value = dict(
+            data=dict(a=1), config=dict(msg=False), id="1"
+        )
+        log_json = dict(profile=dict(phases=dict(solve=dict(wall=1)), sizes=dict()))
+
+        def fun(data, config):
+            return dict(b=2), dict(), dict(), "", log_json
+
+        dag_run = Mock()
+        dag_run.conf = dict(exec_id="1")
+        du.cf_solve(fun, "dag", Mock(), dag_run=dag_run)
+        payload = client.write_solution.call_args[1]
+        profile = payload["log_json"]["profile"]
+        self.assertIn("solve", profile["phases"])
+        self.assertIn("dag_fetch", profile["phases"])
+        self.assertNotIn("peak_rss", profile["phases"]["dag_fetch"])
+        if get_peak_rss() is not None:
+            self.assertIsNotNone(profile["peak_rss"])
+        # the sizes of the payloads are only measured on request
+        self.assertEqual(profile["sizes"], dict())
+        config = dict(msg=False, profileSizes=True)
+        client.get_data.return_value = dict(data=dict(a=1), config=config, id="1")
+        log_json["profile"] = dict(phases=dict(solve=dict(wall=1)), sizes=dict())
+        du.cf_solve(fun, "dag", Mock(), dag_run=dag_run)
+        profile = client.write_solution.call_args[1]["log_json"]["profile"]
+        self.assertEqual(profile["sizes"], dict(instance=7, solution=7))
+
+    @patch("cornflow_client.airflow.dag_utilities.connect_to_cornflow")
+    def test_cf_solve_stop(self, connect_to_cornflow):
+        client = connect_to_cornflow.return_value
+        config = dict(msg=False, stopPollInterval=0.05)
+        client.get_data.return_value = dict(data=dict(a=1), config=config, id="1")
+        client.get_status.return_value = dict(state=-2)
+
+        def fun(data, config):
+            for _ in range(100):
+                if stop_requested():
+                    return dict(b=2), dict(), dict(), "", dict(stopped=True)
+                time.sleep(0.05)
+            return dict(b=2), dict(), dict(), "", dict(stopped=False)
+
+        dag_run = Mock()
+        dag_run.conf = dict(exec_id="1")
+        du.cf_solve(fun, "dag", Mock(), dag_run=dag_run)
+        payload = client.write_solution.call_args[1]
+        self.assertTrue(payload["log_json"]["stopped"])
+        # the stop request does not outlive the solve
+        self.assertFalse(stop_requested())
+        # without stopPollInterval, the state of the execution is not polled
+        client.get_status.reset_mock()
+        client.get_data.return_value = dict(
+            data=dict(a=1), config=dict(msg=False), id="1"
+        )
+        du.cf_solve(
+            lambda data, config: (dict(b=2), dict(), dict(), "", dict()),
+            "dag",
+            Mock(),
+            dag_run=dag_run,
+        )
+        client.get_status.assert_not_called()
+
+    @patch("cornflow_client.airflow.dag_utilities.connect_to_cornflow")
+    def test_cf_solve_stop_on_signal(self, connect_to_cornflow):
+        client = connect_to_cornflow.return_value
+        handlers = []
+
+        def fun(data, config):
+            handlers.append(signal.getsignal(signal.SIGTERM))
+            return dict(b=2), dict(), dict(), "", dict()
+
+        dag_run = Mock()
+        dag_run.conf = dict(exec_id="1")
+        previous = signal.getsignal(signal.SIGTERM)
+        for config in [dict(msg=False), dict(msg=False, stopOnSignal=True)]:
+            client.get_data.return_value = dict(data=dict(a=1), config=config, id="1")
+            du.cf_solve(fun, "dag", Mock(), dag_run=dag_run)
+            self.assertIs(signal.getsignal(signal.SIGTERM), previous)
+        self.assertIs(handlers[0], previous)
+        self.assertIsNot(handlers[1], previous)
+
+    @patch("cornflow_client.airflow.dag_utilities.connect_to_cornflow")
+    def test_cf_solve_checkpoints(self, connect_to_cornflow):
+        client = connect_to_cornflow.return_value
+        config = dict(msg=False, solver="improving", checkpointInterval=0.01)
+        client.get_data.return_value = dict(data=dict(number=1), config=config, id="1")
+        dag_run = Mock()
+        dag_run.conf = dict(exec_id="1")
+        app = GoodApp()
+        du.cf_solve_app(app, Mock(), dag_run=dag_run)
+        calls = [c[1] for c in client.write_solution.call_args_list]
+        checkpoints = [c for c in calls if c["state"] == 0]
+        self.assertEqual(
+            [c["data"] for c in checkpoints], [dict(a=3), dict(a=2), dict(a=1)]
+        )
+        self.assertEqual(calls[-1]["state"], 1)
+        self.assertEqual(app.incumbent_callbacks, [])
+
+    def test_checkpointer_interval(self):
+        client = Mock()
+        checkpointer = du.SolutionCheckpointer(client, "1", "dag", min_interval=0.3)
+        checkpointer.start()
+        for objective in [3, 2, 1]:
+            solution = Mock()
+            solution.to_dict.return_value = dict(a=objective)
+            checkpointer(solution, objective)
+            time.sleep(0.05)
+        time.sleep(0.5)
+        checkpointer.stop()
+        calls = [c[1]["data"] for c in client.write_solution.call_args_list]
+        self.assertEqual(calls, [dict(a=3), dict(a=1)])
+
+    @patch("cornflow_client.airflow.dag_utilities.connect_to_cornflow")
+    def test_cf_solve_log_stream(self, connect_to_cornflow):
+        client = connect_to_cornflow.return_value
+        config = dict(msg=False, solver="improving", logStreamInterval=0.02)
+        client.get_data.return_value = dict(data=dict(number=1), config=config, id="1")
+        dag_run = Mock()
+        dag_run.conf = dict(exec_id="1")
+        app = GoodApp()
+        du.cf_solve_app(app, Mock(), dag_run=dag_run)
+        calls = [c[1] for c in client.write_solution.call_args_list]
+        streamed = [c["log_text"] for c in calls if c["state"] == 0]
+        self.assertGreater(len(streamed), 0)
+        self.assertTrue(streamed[0].startswith("objective: 3"))
+        self.assertEqual(
+            calls[-1]["log_text"], "objective: 3\nobjective: 2\nobjective: 1\n"
+        )
+        self.assertIsNone(app.log_stream)
@@ -4,9 +4,22 @@
 import json
 import os
 import pickle
+import tempfile
+from types import GeneratorType
 from unittest import TestCase
-
-from cornflow_client import InstanceCore
+from unittest.mock import patch
+
+from cornflow_client import Index, InstanceCore, memoize
+from cornflow_client.constants import STORAGE_COLUMNAR, STORAGE_LAZY
+from cornflow_client.core import compiled
+from cornflow_client.core.columnar import ColumnarTable
+from cornflow_client.core.lazy import LazySuperDict
+from cornflow_client.core.coercion import coerce_column
+from cornflow_client.core.fingerprint import get_fingerprint
+from cornflow_client.core.tools import copy
+from cornflow_client.core.read_tools import read_excel, read_excel_pandas
+from cornflow_client.core.write_tools import write_excel
+from pytups import SuperDict
 
 from cornflow_client.schema.tools import get_empty_schema
 
@@ -79,6 +92,20 @@ class TestSimpleApplicationDag(TestCase):
         self.assertEqual(instance.data, instance_2.data)
         os.remove(_get_file("../data/gc_input_export.xlsx"))
 
+    def test_to_parquet(self):
+        instance = self.test_instance_from_dict()
+        with tempfile.TemporaryDirectory() as path:
+            instance.to_parquet(path)
+            instance_2 = self.class_to_use.from_parquet(path)
+        self.assertEqual(instance.data, instance_2.data)
+
+    def test_to_csv_dir(self):
+        instance = self.test_instance_from_dict()
+        with tempfile.TemporaryDirectory() as path:
+            instance.to_csv_dir(path)
+            instance_2 = self.class_to_use.from_csv_dir(path)
+        self.assertEqual(instance.data, instance_2.data)
+
 
 class TestCustomInstanceDag(TestSimpleApplicationDag):
     def setUp(self):
@@ -99,6 +126,477 @@ class TestCustomInstanceDag(TestSimpleApplicationDag):
         return instance
 
 
+class TestColumnarInstance(TestCase):
+    def setUp(self):
+        self.instance_data = _load_file(_get_file("../data/gc_input.json"))
+
+    def test_columnar_storage(self):
+        instance = ColumnarInstance.from_dict(self.instance_data)
+        pairs = instance.data["pairs"]
+        self.assertIsInstance(pairs, ColumnarTable)
+        self.assertEqual(pairs.column("n1").dtype, "int64")
+        self.assertEqual(pairs[0], self.instance_data["pairs"][0])
+        self.assertEqual(pairs[-1], self.instance_data["pairs"][-1])
+        self.assertEqual(self.instance_data, instance.to_dict())
+        self.assertEqual([], instance.check_schema())
+
+    def test_columnar_parquet(self):
+        data = dict(self.instance_data, parameters=dict(a=1), other=[dict(b=None)])
+        instance = ColumnarInstance.from_dict(data)
+        with tempfile.TemporaryDirectory() as path:
+            instance.to_parquet(path)
+            self.assertEqual(
+                sorted(os.listdir(path)),
+                ["other.parquet", "pairs.parquet", "tables.json"],
+            )
+            instance_2 = ColumnarInstance.from_parquet(
+                path, tables=["pairs", "parameters"]
+            )
+            self.assertIsInstance(instance_2.data["pairs"], ColumnarTable)
+            self.assertEqual(instance_2.data["pairs"].column("n2").dtype, "int64")
+            self.assertEqual(
+                instance_2.to_dict(),
+                dict(pairs=self.instance_data["pairs"], parameters=dict(a=1)),
+            )
+            instance_3 = SimpleInstance.from_parquet(path, tables=["other"])
+        self.assertEqual(instance_3.data, dict(other=[dict(b=None)]))
+
+    def test_parquet_nulls(self):
+        records = [dict(a=1, b=2), dict(a=2), dict(a=None, b=3)]
+        with tempfile.TemporaryDirectory() as path:
+            SimpleInstance.from_dict(dict(t=records)).to_parquet(path)
+            instance = SimpleInstance.from_parquet(path)
+            table = ColumnarInstance.from_parquet(path).data["t"]
+        self.assertEqual(instance.data["t"], records)
+        self.assertEqual(table.to_records(), records)
+        # a null value is kept as None, a missing one only in the mask
+        self.assertEqual(table.column("a").dtype, object)
+        self.assertEqual(table.column("b").dtype, "int64")
+
+    def test_columnar_compiled(self):
+        instance = ColumnarInstance.from_dict(self.instance_data)
+        with tempfile.TemporaryDirectory() as path:
+            artifact = instance.compile(path, "hash")
+            if compiled.PICKLE_PROTOCOL >= 5:
+                # the arrays are written out of band
+                self.assertGreater(os.path.getsize(artifact + ".buf"), 0)
+            instance_2 = ColumnarInstance.from_compiled(path, "hash")
+            self.assertIsNone(ColumnarInstance.from_compiled(path, "other"))
+            self.assertEqual(instance_2.to_dict(), self.instance_data)
+            column = instance_2.data["pairs"].column("n1")
+            column[0] = 100
+            self.assertEqual(column[0], 100)
+
+    def test_columnar_compiled_protocol_4(self):
+        instance = ColumnarInstance.from_dict(self.instance_data)
+        with tempfile.TemporaryDirectory() as path:
+            with patch.object(compiled, "PICKLE_PROTOCOL", 4):
+                artifact = instance.compile(path, "hash")
+                instance_2 = ColumnarInstance.from_compiled(path, "hash")
+            self.assertEqual(os.path.getsize(artifact + ".buf"), 0)
+            self.assertEqual(instance_2.to_dict(), self.instance_data)
+
+    def test_columnar_mixed_values(self):
+        records = [dict(n1=1, n2=2), dict(n1=None, n2=3), dict(n2=4, extra="a")]
+        table = ColumnarTable.from_records(
+            records, ColumnarInstance.schema["properties"]["pairs"]["items"]
+        )
+        self.assertEqual(table.column("n1").dtype, object)
+        self.assertEqual(table.column("n2").dtype, "int64")
+        self.assertEqual(table.to_records(), records)
+        self.assertEqual(list(table), records)
+        self.assertEqual(table[2], records[2])
+
+    def test_columnar_numbers(self):
+        schema = dict(
+            properties=dict(
+                big=dict(type="number"),
+                mixed=dict(type="number"),
+                floats=dict(type="number"),
+                ints=dict(type="number"),
+            )
+        )
+        records = [
+            dict(big=2**70, mixed=1, floats=1.5, ints=1),
+            dict(big=1, mixed=2.5, floats=2.0, ints=2),
+        ]
+        table = ColumnarTable.from_records(records, schema)
+        dtypes = {name: table.column(name).dtype for name in schema["properties"]}
+        self.assertEqual(
+            dtypes, dict(big=object, mixed=object, floats="float64", ints="int64")
+        )
+        self.assertEqual(table.to_records(), records)
+        self.assertIs(type(table[0]["mixed"]), int)
+        # the records are built while iterating
+        self.assertIsInstance(iter(table), GeneratorType)
+        self.assertEqual(next(iter(table)), records[0])
+
+
+class TestLazyInstance(TestCase):
+    def test_lazy_storage(self):
+        data = dict(a=dict(b=dict(c=1)), d=dict(e=2), f=[dict(g=3)])
+        instance = LazyInstance.from_dict(data)
+        self.assertIsInstance(instance.data, LazySuperDict)
+        self.assertEqual(instance.data.converted, 0)
+        self.assertIsInstance(instance.data["a"]["b"], SuperDict)
+        self.assertEqual(instance.data.converted, 2)
+        self.assertEqual(instance.data["a"]["b"].vapply(lambda v: v + 1), dict(c=2))
+        self.assertEqual(SuperDict.from_dict(data), instance.to_dict())
+        self.assertIsInstance(instance.data["f"][0], dict)
+        # the original data is not modified through the wrapper
+        instance.data["d"]["e"] = 5
+        self.assertEqual(data["d"]["e"], 2)
+
+
+class TestExcelTools(TestCase):
+    def test_read_excel_schema(self):
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = "table"
+        for row in [
+            ["id", "code", "flag"],
+            [1.0, 5, "TRUE"],
+            [None, None, None],
+            [2, "a", False],
+        ]:
+            sheet.append(row)
+        params = workbook.create_sheet("params")
+        for row in [["size", 3.0], ["name", 7]]:
+            params.append(row)
+        schema = dict(
+            properties=dict(
+                table=dict(
+                    type="array",
+                    items=dict(
+                        type="object",
+                        properties=dict(
+                            id=dict(type="integer"), code=dict(type="string")
+                        ),
+                    ),
+                ),
+                params=dict(
+                    type="object",
+                    properties=dict(
+                        size=dict(type="integer"), name=dict(type="string")
+                    ),
+                ),
+            )
+        )
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "data.xlsx")
+            workbook.save(filename)
+            data = read_excel(filename, ["params"], schema)
+            raw_data = read_excel(filename, ["params"])
+            pandas_data = read_excel_pandas(filename, ["params"], schema)
+        self.assertEqual(
+            data["table"],
+            [dict(id=1, code="5", flag=True), dict(id=2, code="a", flag=False)],
+        )
+        self.assertIsInstance(data["table"][0]["id"], int)
+        self.assertEqual(data["params"], dict(size=3, name="7"))
+        self.assertEqual(raw_data["table"][0], dict(id=1.0, code=5, flag=True))
+        self.assertEqual(raw_data["params"], dict(size=3.0, name=7))
+        # pandas keeps the blank rows
+        self.assertEqual(pandas_data["params"], data["params"])
+        self.assertEqual(pandas_data["table"][0::2], data["table"])
+
+    def test_csv_dir(self):
+        csv_schema = dict(
+            properties=dict(
+                table=dict(
+                    type="array",
+                    items=dict(
+                        type="object",
+                        properties=dict(a=dict(type="integer"), b=dict(type="string")),
+                    ),
+                ),
+                params=dict(type="object", properties=dict(name=dict(type="string"))),
+            )
+        )
+
+        class CsvInstance(InstanceCore):
+            schema = csv_schema
+        data = dict(
+            table=[dict(b="1", a=1, c=True), dict(a=2, b="é", c=1.5), dict(a=3)],
+            params=dict(name="10", size=3),
+        )
+        instance = CsvInstance.from_dict(data)
+        with tempfile.TemporaryDirectory() as path:
+            instance.to_csv_dir(path)
+            with open(os.path.join(path, "table.csv")) as f:
+                self.assertEqual(f.readline().strip(), "a,b,c")
+            instance_2 = CsvInstance.from_csv_dir(path, max_workers=2)
+            instance_3 = CsvInstance.from_csv_dir(path, tables=["params"])
+        expected = dict(data)
+        # the empty cells of the string columns are empty strings
+        expected["table"] = [
+            dict(a=1, b="1", c=True),
+            dict(a=2, b="é", c=1.5),
+            dict(a=3, b="", c=None),
+        ]
+        self.assertEqual(instance_2.to_dict(), expected)
+        self.assertEqual(instance_3.to_dict(), dict(params=data["params"]))
+
+    def test_coerce_column(self):
+        nan = float("nan")
+        cases = [
+            ([1.0, nan, 2.5, "3"], dict(type="integer"), [1, None, 2.5, 3]),
+            ([1, 2.5, nan], dict(type=["number", "null"]), [1, 2.5, None]),
+            (
+                ["TRUE", "false", 0, nan],
+                dict(type="boolean"),
+                [True, False, False, None],
+            ),
+            ([1, 2.0, "TRUE", nan], dict(type="string"), ["1", "2", "TRUE", None]),
+            (["TRUE", "a", 1, nan], None, [True, "a", 1, None]),
+        ]
+        for values, schema, expected in cases:
+            self.assertEqual(coerce_column(values, schema), expected)
+        values = [1, 2, None]
+        self.assertEqual(coerce_column(values, dict(type="integer")), values)
+
+    def test_write_excel_schema(self):
+        import openpyxl
+
+        schema = dict(
+            properties=dict(
+                table=dict(
+                    type="array",
+                    items=dict(
+                        type="object",
+                        properties=dict(a=dict(type="integer"), b=dict(type="string")),
+                    ),
+                )
+            )
+        )
+        data = dict(
+            table=[dict(c=[1], b=2, a=1.0), dict(a=3, b="x")], params=dict(size=3)
+        )
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "data.xlsx")
+            write_excel(filename, data, schema)
+            workbook = openpyxl.load_workbook(filename, read_only=True)
+            rows = [list(row) for row in workbook["table"].iter_rows(values_only=True)]
+            params = [
+                list(row) for row in workbook["params"].iter_rows(values_only=True)
+            ]
+            workbook.close()
+            data_2 = read_excel(filename, ["params"], schema)
+        self.assertEqual(rows[:2], [["a", "b", "c"], [1, "2", "[1]"]])
+        self.assertEqual(data_2["table"][1], dict(a=3, b="x", c=None))
+        self.assertEqual(params, [["size", 3]])
+
+    def test_write_excel_lists(self):
+        import openpyxl
+
+        data = dict(t=[[1, 2], [3, 4]], mixed=[dict(a=1), 2], params=dict(size=3))
+        with tempfile.TemporaryDirectory() as path:
+            filename = os.path.join(path, "data.xlsx")
+            with self.assertWarns(UserWarning):
+                write_excel(filename, data)
+            workbook = openpyxl.load_workbook(filename, read_only=True)
+            sheets = workbook.sheetnames
+            rows = [list(row) for row in workbook["t"].iter_rows(values_only=True)]
+            workbook.close()
+        self.assertEqual(sheets, ["t", "params"])
+        self.assertEqual(rows, [[0, 1], [1, 2], [3, 4]])
+
+
+class TestIndexes(TestCase):
+    def setUp(self):
+        self.instance_data = _load_file(_get_file("../data/gc_input.json"))
+
+    def test_indexes(self):
+        instance = IndexedInstance.from_dict(self.instance_data)
+        pairs = instance.get_index("pairs")
+        self.assertEqual(pairs[0, 5], dict(n1=0, n2=5))
+        self.assertIs(instance.get_index("pairs"), pairs)
+        by_n1 = instance.get_index("pairs_by_n1")
+        self.assertEqual(by_n1[1].take("n2"), [4, 22, 47])
+        instance.data = dict(pairs=[dict(n1=7, n2=8)])
+        self.assertEqual(instance.get_index("pairs_by_n1"), {7: [dict(n1=7, n2=8)]})
+
+    def test_unique_index_repeated(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)] * 2))
+        self.assertRaises(ValueError, instance.get_index, "pairs")
+
+
+class TestMemoize(TestCase):
+    def test_memoize(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)]))
+        self.assertEqual(instance.neighbors(1), [2])
+        self.assertEqual(instance.neighbors(1), [2])
+        self.assertEqual(instance.nodes, {1, 2})
+        self.assertEqual(instance.nodes, {1, 2})
+        self.assertEqual(instance.calls, 2)
+        instance.data = dict(pairs=[dict(n1=1, n2=3)])
+        self.assertEqual(instance.neighbors(1), [3])
+        self.assertEqual(instance.calls, 3)
+        stats = instance.get_memo_stats()
+        self.assertEqual(
+            stats["IndexedInstance.neighbors"],
+            dict(hits=1, misses=2, size=1, evictions=0, invalidations=1),
+        )
+        self.assertEqual(stats["IndexedInstance.nodes"]["hits"], 1)
+
+    def test_compiled_precomputations(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)]))
+        with tempfile.TemporaryDirectory() as path:
+            instance.compile(path, "hash")
+            instance_2 = IndexedInstance.from_compiled(path, "hash")
+        self.assertEqual(instance_2.nodes, {1, 2})
+        self.assertEqual(instance_2.calls, 1)
+        self.assertIn("pairs_by_n1", instance_2._index_cache)
+
+    def test_compiled_version(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)]))
+
+        class NewIndexedInstance(IndexedInstance):
+            compiled_version = 2
+
+        NewIndexedInstance.__qualname__ = IndexedInstance.__qualname__
+        with tempfile.TemporaryDirectory() as path:
+            instance.compile(path, "hash")
+            self.assertIsNone(NewIndexedInstance.from_compiled(path, "hash"))
+            self.assertIsNotNone(IndexedInstance.from_compiled(path, "hash"))
+
+    def test_compiled_eviction(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)]))
+        with tempfile.TemporaryDirectory() as path:
+            artifact = instance.compile(path, "hash_1")
+            size = os.path.getsize(artifact + ".pkl") + os.path.getsize(
+                artifact + ".buf"
+            )
+            instance.compile(path, "hash_2")
+            # hash_1 becomes the most recently used
+            IndexedInstance.from_compiled(path, "hash_1")
+            instance.compile(path, "hash_3", max_size=2 * size)
+            self.assertEqual(len(os.listdir(path)), 4)
+            self.assertIsNotNone(IndexedInstance.from_compiled(path, "hash_1"))
+            self.assertIsNone(IndexedInstance.from_compiled(path, "hash_2"))
+
+    def test_memoize_maxsize(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)]))
+        for node in [1, 2, 3, 1]:
+            instance.neighbors(node)
+        stats = instance.get_memo_stats()["IndexedInstance.neighbors"]
+        self.assertEqual(stats["size"], 2)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["hits"], 0)
+
+
+class TestFingerprint(TestCase):
+    def setUp(self):
+        self.instance_data = _load_file(_get_file("../data/gc_input.json"))
+
+    def test_fingerprint(self):
+        instance = SimpleInstance.from_dict(self.instance_data)
+        fingerprint = instance.fingerprint()
+        self.assertEqual(fingerprint, get_fingerprint(self.instance_data))
+        # the same data with other storage, key order and number types
+        pairs = [
+            dict(n2=float(p["n2"]), n1=p["n1"]) for p in self.instance_data["pairs"]
+        ]
+        self.assertEqual(
+            fingerprint, ColumnarInstance.from_dict(dict(pairs=pairs)).fingerprint()
+        )
+        self.assertEqual(
+            fingerprint, LazyInstance.from_dict(self.instance_data).fingerprint()
+        )
+        instance.data["pairs"][0]["n2"] += 0.5
+        self.assertNotEqual(fingerprint, instance.fingerprint())
+
+    def test_table_fingerprints(self):
+        data = dict(a=[dict(x=1), dict(y="1")], b=dict(c=[1, None, True]))
+        fingerprints = SimpleInstance.from_dict(data).table_fingerprints()
+        changed = dict(data, a=[dict(x=1), dict(y=1)])
+        fingerprints_2 = SimpleInstance.from_dict(changed).table_fingerprints()
+        self.assertNotEqual(fingerprints["a"], fingerprints_2["a"])
+        self.assertEqual(fingerprints["b"], fingerprints_2["b"])
+        # a missing value is not the same as a null
+        self.assertNotEqual(
+            get_fingerprint([dict(x=1), dict()]),
+            get_fingerprint([dict(x=1), dict(x=None)]),
+        )
+        self.assertNotEqual(get_fingerprint(["ab", "c"]), get_fingerprint(["a", "bc"]))
+
+    def test_fingerprint_table_end(self):
+        # the values after a table are not read as another column of the table
+        self.assertNotEqual(
+            get_fingerprint(dict(p=dict(a=[dict(x=1)], y=2))),
+            get_fingerprint(dict(p=dict(a=[dict(x=1, y=2)]))),
+        )
+        self.assertNotEqual(
+            get_fingerprint([[dict(x=1)], "y", 2]), get_fingerprint([[dict(x=1, y=2)]])
+        )
+        records = [dict(x=1)]
+        table = ColumnarTable.from_records(records)
+        self.assertEqual(get_fingerprint([records, "y"]), get_fingerprint([table, "y"]))
+
+
+class TestClone(TestCase):
+    def setUp(self):
+        self.instance_data = _load_file(_get_file("../data/gc_input.json"))
+
+    def test_clone(self):
+        instance = SimpleInstance.from_dict(self.instance_data)
+        data = instance.data
+        clone = instance.clone()
+        # the object is not changed
+        self.assertIs(instance.data, data)
+        self.assertEqual(clone.data, instance.data)
+        clone.data["pairs"][0]["n1"] = 100
+        clone.data["pairs"].append(dict(n1=1, n2=2))
+        self.assertEqual(instance.data["pairs"][0], self.instance_data["pairs"][0])
+        self.assertEqual(len(clone.data["pairs"]), len(instance.data["pairs"]) + 1)
+        # a clone of a clone
+        clone_2 = clone.clone()
+        clone_2.data["pairs"][0]["n1"] = 300
+        self.assertEqual(clone.data["pairs"][0]["n1"], 100)
+        self.assertEqual(clone_2.to_dict(), copy(clone_2.to_dict()))
+        self.assertIsInstance(pickle.loads(pickle.dumps(clone_2.data)), SuperDict)
+
+    def test_clone_iterate(self):
+        instance = SimpleInstance.from_dict(self.instance_data)
+        original = copy(self.instance_data)
+        clone = instance.clone()
+        # the records that were not reached are shared
+        self.assertIs(
+            list.__getitem__(instance.data["pairs"], 5),
+            list.__getitem__(dict.__getitem__(clone.data, "pairs"), 5),
+        )
+        for record in clone.data["pairs"]:
+            record["n1"] = 100
+        for name, table in clone.data.items():
+            table.append(dict(n1=1, n2=2))
+        for record in clone.data["pairs"].vfilter(lambda r: r["n2"] == 2):
+            record["n2"] = 200
+        clone_2 = instance.clone()
+        for table in clone_2.data.values():
+            table.pop()
+        self.assertEqual(clone_2.data.popitem()[1].pop(), original["pairs"][-2])
+        self.assertEqual(instance.to_dict(), original)
+        self.assertEqual(clone.data["pairs"][-1], dict(n1=1, n2=200))
+
+    def test_clone_memoize(self):
+        instance = IndexedInstance.from_dict(dict(pairs=[dict(n1=1, n2=2)]))
+        self.assertEqual(instance.nodes, {1, 2})
+        index = instance.get_index("pairs")
+        version = instance.data_version
+        clone = instance.clone()
+        # the object keeps its indexes and memoized results
+        self.assertEqual(instance.data_version, version)
+        self.assertIs(instance.get_index("pairs"), index)
+        self.assertEqual(instance.nodes, {1, 2})
+        self.assertEqual(instance.calls, 1)
+        clone.data["pairs"].append(dict(n1=3, n2=4))
+        self.assertEqual(clone.nodes, {1, 2, 3, 4})
+        self.assertEqual(instance.nodes, {1, 2})
+        self.assertEqual(clone.get_index("pairs_by_n1")[3], [dict(n1=3, n2=4)])
+
+
 class SimpleInstance(InstanceCore):
     schema = get_empty_schema()
 
@@ -119,3 +617,34 @@ class Instance(InstanceCore):
 
         data_p = {el: self.data[el].values_l() for el in tables}
         return pickle.loads(pickle.dumps(data_p, -1))
+
+
+class ColumnarInstance(InstanceCore):
+    schema = _load_file(_get_file("../data/graph_coloring_input.json"))
+    storage = STORAGE_COLUMNAR
+
+
+class LazyInstance(InstanceCore):
+    schema = get_empty_schema()
+    storage = STORAGE_LAZY
+
+
+class IndexedInstance(InstanceCore):
+    schema = _load_file(_get_file("../data/graph_coloring_input.json"))
+    indexes = dict(
+        pairs=Index("pairs", ("n1", "n2")),
+        pairs_by_n1=Index("pairs", "n1", unique=False),
+    )
+    precomputations = ["nodes"]
+    calls = 0
+
+    @memoize(maxsize=2)
+    def neighbors(self, node):
+        self.calls += 1
+        return [pair["n2"] for pair in self.data["pairs"] if pair["n1"] == node]
+
+    @property
+    @memoize
+    def nodes(self):
+        self.calls += 1
+        return {pair[n] for pair in self.data["pairs"] for n in ["n1", "n2"]}
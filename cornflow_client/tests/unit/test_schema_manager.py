@@ -12,6 +12,7 @@ from unittest import TestCase
 from cornflow_client import SchemaManager
 from cornflow_client.constants import DATASCHEMA
 from cornflow_client.core.tools import load_json
+from cornflow_client.schema.inference import infer_schema, sample_rows
 from cornflow_client.tests.const import dict_example
 
 
@@ -237,6 +238,40 @@ class TestSchemaManager(TestCase):
         self.assertEqual(dataframes["_README"].shape, (1, 2))
         self.assertEqual(dataframes["_TYPES"].shape, (2, 3))
 
+    def test_draft_schema_sample(self):
+        sm = SchemaManager({})
+        path = self.get_data_file("gc_input.json")
+        full = json.loads(sm.draft_schema_from(path))
+        sampled = json.loads(sm.draft_schema_from(path, sample_size=10))
+        self.assertEqual(full, sampled)
+
+    def test_infer_schema(self):
+        data = dict(
+            table=[dict(a=i, b=str(i), c=None if i % 2 else 1.5) for i in range(100)]
+            + [dict(a=1.5, d=[1, 2])],
+            params=dict(size=3),
+        )
+        schema, confidence = infer_schema(data, sample_size=1000)
+        items = schema["properties"]["table"]["items"]
+        self.assertEqual(items["properties"]["a"], dict(type="number"))
+        self.assertEqual(items["properties"]["c"], dict(type=["null", "number"]))
+        self.assertEqual(items["properties"]["d"]["type"], "array")
+        self.assertEqual(items["required"], ["a"])
+        self.assertEqual(confidence, dict(table=1, params=1))
+        _, confidence = infer_schema(data, sample_size=20)
+        self.assertAlmostEqual(confidence["table"], 20 / 101)
+
+    def test_sample_rows(self):
+        rows = list(range(1000))
+        sample, total = sample_rows(rows, 10, head_size=4)
+        self.assertEqual(total, 1000)
+        self.assertEqual(sample[:4], [0, 1, 2, 3])
+        self.assertEqual(len(set(sample)), 10)
+        sample_2, total_2 = sample_rows(iter(rows), 10, head_size=4)
+        self.assertEqual(total_2, 1000)
+        self.assertEqual(sample_2[:4], [0, 1, 2, 3])
+        self.assertEqual(len(set(sample_2)), 10)
+
     # TODO: fix this test and uncomment
     # def test_list_of_lists(self):
     #     sm = SchemaManager.from_filepath(self.get_data_file('graph_coloring2_input.json'))
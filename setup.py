@@ -7,7 +7,11 @@ required = []
 with open("requirements.txt", "r") as fh:
     required.append(fh.read().splitlines())
 
-extra_required = {"excel": ["openpyxl", "pandas"]}
+extra_required = {
+    "excel": ["openpyxl", "pandas"],
+    "columnar": ["numpy"],
+    "arrow": ["pyarrow", "numpy"],
+}
 
 
 setuptools.setup(